@@ -0,0 +1,79 @@
+"""
+Compares a benchmark run against a saved baseline and flags regressions.
+A case regresses when its median time exceeds the baseline's by more than the threshold
+(and by more than --min-delta seconds, so noise on very fast cases is ignored).
+Exits with status 1 if any case regressed.
+
+Usage:
+    python -m benchmarks.compare BASELINE CURRENT [--threshold 0.2] [--min-delta 0.005]
+        [--case-threshold "generate_households[k=1]=0.5" ...]
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def parse_case_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        name, _, threshold = value.rpartition("=")
+        if not name:
+            raise argparse.ArgumentTypeError(f"Expected NAME=THRESHOLD, got {value!r}")
+        thresholds[name] = float(threshold)
+    return thresholds
+
+
+def compare(baseline: Dict[str, dict], current: Dict[str, dict], threshold: float, min_delta: float, case_thresholds: Dict[str, float]) -> List[str]:
+    """Prints a comparison table and returns the names of the cases that regressed."""
+    regressions = []
+    print(f"{'case':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            print(f"{name:<45} {'':>12} {'missing':>12}")
+            continue
+        if name not in baseline:
+            print(f"{name:<45} {'new':>12} {current[name]['median_s'] * 1000:10.1f}ms")
+            continue
+
+        before, after = baseline[name]["median_s"], current[name]["median_s"]
+        change = after / before - 1 if before > 0 else 0.0
+        status = ""
+        if change > case_thresholds.get(name, threshold) and after - before > min_delta:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change < -case_thresholds.get(name, threshold) and before - after > min_delta:
+            status = "improved"
+        print(f"{name:<45} {before * 1000:10.1f}ms {after * 1000:10.1f}ms {change:+9.1%}  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Slowdowns smaller than this many seconds are ignored")
+    parser.add_argument("--case-threshold", nargs="+", default=[], help="Per-case thresholds as NAME=THRESHOLD")
+    args = parser.parse_args()
+
+    regressions = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        args.threshold,
+        args.min_delta,
+        parse_case_thresholds(args.case_threshold),
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
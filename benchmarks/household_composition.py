@@ -0,0 +1,82 @@
+"""
+Benchmarks the vectorised household composition classifiers against the
+per-household groupby/apply implementation and checks that the labels are identical.
+
+Usage:
+    python -m benchmarks.household_composition [--sizes 10000 1000000] [--reference-limit 20000]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
+from src.classifiers.household_type.un_global import UNHouseholdCompositionClassifier
+
+ROLES = ["Head", "Partner", "Spouse", "Child", "Parent", "Sibling", "Grandchild", "Cousin", "Lodger", "Friend", None]
+# Mostly family households, with enough unusual roles to reach every branch of the rules
+ROLE_WEIGHTS = [0, 0.18, 0.05, 0.45, 0.08, 0.08, 0.05, 0.03, 0.03, 0.03, 0.02]
+
+
+def synthetic_population(n_households: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sizes = rng.choice([1, 2, 3, 4, 5, 6], size=n_households, p=[0.28, 0.34, 0.16, 0.14, 0.06, 0.02])
+    household_id = np.repeat(np.arange(n_households), sizes)
+    n_people = len(household_id)
+
+    first_member = np.r_[True, household_id[1:] != household_id[:-1]]
+    relationship = rng.choice(np.array(ROLES, dtype=object), size=n_people, p=ROLE_WEIGHTS)
+    # Most households list the head first; a few have none or a second head
+    relationship[first_member & (rng.random(n_people) < 0.97)] = "Head"
+    relationship[~first_member & (rng.random(n_people) < 0.01)] = "Head"
+
+    age = rng.integers(0, 95, size=n_people).astype(float)
+    age[rng.random(n_people) < 0.01] = np.nan
+
+    return pd.DataFrame({"household_id": household_id, "relationship": relationship, "age": age})
+
+
+def reference_labels(classifier, df: pd.DataFrame) -> pd.Series:
+    return df.groupby("household_id")[["relationship", "age"]].apply(
+        lambda x: classifier.classify_household_structure(x, "relationship")
+    )
+
+
+def vectorised_labels(classifier, df: pd.DataFrame) -> pd.Series:
+    if isinstance(classifier, UKHouseholdCompositionClassifier):
+        return classifier.classify_household_structures(df, "relationship")
+    return classifier.classify_households(df, "relationship")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark household composition classification.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--reference-limit", type=int, default=20_000,
+                        help="Largest population the groupby/apply reference is run on")
+    args = parser.parse_args()
+
+    classifiers = [UKHouseholdCompositionClassifier(), UNHouseholdCompositionClassifier()]
+    for n_households in args.sizes:
+        df = synthetic_population(n_households)
+        print(f"\n{n_households:,} households ({len(df):,} people)")
+        for classifier in classifiers:
+            labels, vectorised_time = timed(vectorised_labels, classifier, df)
+            line = f"  {classifier.get_name():<10} vectorised {vectorised_time:8.3f}s"
+
+            if n_households <= args.reference_limit:
+                expected, reference_time = timed(reference_labels, classifier, df)
+                if not labels.equals(expected.astype(object)):
+                    mismatches = (labels != expected).sum()
+                    raise AssertionError(f"{classifier.get_name()}: {mismatches} households labelled differently")
+                line += f"   apply {reference_time:8.3f}s   speedup {reference_time / vectorised_time:6.1f}x   labels identical"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
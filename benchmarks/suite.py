@@ -0,0 +1,273 @@
+"""
+End-to-end benchmarks of the population generation pipeline, run offline against FakeLLM.
+Each case runs once to warm up, then `--repeats` times, and the timings are written as JSON.
+Compare a run against a saved baseline with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.suite [--output benchmarks/results/latest.json] [--only generate_households ...] [--quick]
+    python -m benchmarks.compare benchmarks/results/baseline.json benchmarks/results/latest.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from benchmarks.household_composition import synthetic_population
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOCATION = "Newcastle"
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], Any]
+    # Number of items (households, rows...) processed per run, for throughput
+    items: Optional[int] = None
+    unit: Optional[str] = None
+
+
+def population_frame(n_households: int, seed: int = 0) -> pd.DataFrame:
+    """A population in the layout of the populations table, as the app and metrics read it."""
+    rng = np.random.default_rng(seed)
+    df = synthetic_population(n_households, seed)
+    df["relationship"] = df["relationship"].fillna("Lodger")
+    df["age"] = df["age"].fillna(30).astype(int)
+    df["gender"] = rng.choice(["Male", "Female"], size=len(df))
+    df["occupation_category"] = rng.integers(1, 11, size=len(df))
+    df["occupation"] = "Occupation"
+    df["household_id"] = df["household_id"].astype(str)
+    return df
+
+
+def household_lists(df: pd.DataFrame) -> List[List[Dict[str, Any]]]:
+    """The same population as generated households (lists of person dicts)."""
+    people = df.rename(columns={"relationship": "relationship_to_head"})
+    columns = ["age", "gender", "relationship_to_head", "occupation_category", "occupation"]
+    return [group[columns].to_dict("records") for _, group in people.groupby("household_id", sort=False)]
+
+
+def generate_households_cases(quick: bool) -> List[Case]:
+    from src.llm_interface.fake_model import FakeLLM
+    from src.services.file_service import FileService
+    from src.services.population_service import PopulationService
+
+    file_service = FileService()
+    schema = file_service.load_schema("household_schema.json")
+    with open(os.path.join(REPO_ROOT, "src/prompts/fixed_household_size.txt"), encoding="utf-8") as file:
+        base_prompt = file.read()
+    n_households = 100 if quick else 500
+
+    cases = []
+    for households_per_request in [1, 5]:
+        def run(households_per_request=households_per_request):
+            households = PopulationService().generate_households(
+                n_households=n_households,
+                model=FakeLLM(seed=0),
+                base_prompt=base_prompt,
+                schema=schema,
+                location=LOCATION,
+                region="E06000057",
+                batch_size=50,
+                include_stats=True,
+                include_guidance=True,
+                compute_household_size=True,
+                households_per_request=households_per_request,
+            )
+            if len(households) != n_households:
+                raise AssertionError(f"Generated {len(households)} of {n_households} households")
+
+        cases.append(Case(f"generate_households[k={households_per_request}]", run, n_households, "households"))
+    return cases
+
+
+def prompt_build_cases(quick: bool) -> List[Case]:
+    from src.analysis.population_stats import PopulationStatsAccumulator
+    from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
+    from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
+    from src.prompts.statistics_feedback import update_prompt_with_statistics
+
+    with open(os.path.join(REPO_ROOT, "src/prompts/fixed_household_size.txt"), encoding="utf-8") as file:
+        base_prompt = file.read()
+
+    cases = []
+    for n_households in ([1_000, 10_000] if quick else [1_000, 10_000, 100_000]):
+        df = population_frame(n_households)
+        synthetic_df = df.rename(columns={"relationship": "relationship_to_head"})
+        stats = PopulationStatsAccumulator(UKHouseholdSizeClassifier(), UKHouseholdCompositionClassifier())
+        stats.add_households(household_lists(df))
+
+        def from_frame(synthetic_df=synthetic_df):
+            update_prompt_with_statistics(base_prompt, synthetic_df, LOCATION, len(synthetic_df))
+
+        def from_stats(stats=stats):
+            update_prompt_with_statistics(base_prompt, None, LOCATION, stats.n_households, population_stats=stats)
+
+        cases.append(Case(f"prompt_build_dataframe[{n_households}]", from_frame, n_households, "households"))
+        cases.append(Case(f"prompt_build_accumulator[{n_households}]", from_stats, n_households, "households"))
+    return cases
+
+
+def classifier_cases(quick: bool) -> List[Case]:
+    from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
+    from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
+    from src.classifiers.household_type.un_global import UNHouseholdCompositionClassifier
+
+    n_households = 20_000 if quick else 200_000
+    df = synthetic_population(n_households)
+    return [
+        Case(f"classify_composition_uk[{n_households}]", lambda: UKHouseholdCompositionClassifier().classify_households(df, "relationship"), n_households, "households"),
+        Case(f"classify_composition_un[{n_households}]", lambda: UNHouseholdCompositionClassifier().classify_households(df, "relationship"), n_households, "households"),
+        Case(f"classify_size_uk[{n_households}]", lambda: UKHouseholdSizeClassifier().compute_observed_distribution(df), n_households, "households"),
+    ]
+
+
+def metrics_cases(quick: bool) -> List[Case]:
+    from src.analysis.similarity_metrics import compute_convergence_curve, compute_similarity_metrics
+
+    n_households = 2_000 if quick else 20_000
+    df = population_frame(n_households)
+    return [
+        Case(f"compute_similarity_metrics[{n_households}]", lambda: compute_similarity_metrics(df, LOCATION, True), len(df), "people"),
+        Case(f"compute_convergence_curve[{n_households}]", lambda: compute_convergence_curve(df, LOCATION, 100, 10000, True), len(df), "people"),
+    ]
+
+
+def repository_cases(quick: bool) -> List[Case]:
+    from src.repositories.metadata_repository import MetadataRepository
+    from src.repositories.population_repository import PopulationRepository
+
+    n_households = 1_000 if quick else 10_000
+    households = household_lists(population_frame(n_households))
+    n_people = sum(len(household) for household in households)
+    metadata_repository = MetadataRepository()
+    repository = PopulationRepository()
+    runs = iter(range(sys.maxsize))
+
+    def insert(population_id=None):
+        # Populations reference their metadata row, as when a run is saved
+        population_id = population_id or f"benchmark-insert-{next(runs)}"
+        metadata_repository.insert_metadata({"population_id": population_id, "location": LOCATION, "num_households": n_households})
+        repository.insert_population(population_id, households)
+
+    insert("benchmark-read")
+
+    def read():
+        rows = repository.get_population_by_id("benchmark-read")
+        if len(rows) != n_people:
+            raise AssertionError(f"Read {len(rows)} of {n_people} rows")
+
+    return [
+        Case(f"population_insert[{n_households}]", insert, n_people, "rows"),
+        Case(f"population_read[{n_households}]", read, n_people, "rows"),
+    ]
+
+
+def preprocessing_cases(quick: bool) -> List[Case]:
+    # process_all is written to be run as a script from src/preprocessing, against the relative
+    # data/aggregate/{raw,processed} paths; the suite runs it in its scratch directory
+    preprocessing_dir = os.path.join(REPO_ROOT, "src", "preprocessing")
+    if preprocessing_dir not in sys.path:
+        sys.path.insert(0, preprocessing_dir)
+    import process_all
+
+    os.makedirs("data/aggregate", exist_ok=True)
+    if not os.path.exists("data/aggregate/raw"):
+        os.symlink(os.path.join(REPO_ROOT, "data/aggregate/raw"), "data/aggregate/raw")
+    return [Case("process_all", process_all.main)]
+
+
+SUITES: Dict[str, Callable[[bool], List[Case]]] = {
+    "generate_households": generate_households_cases,
+    "prompt_build": prompt_build_cases,
+    "classifiers": classifier_cases,
+    "metrics": metrics_cases,
+    "repository": repository_cases,
+    "preprocessing": preprocessing_cases,
+}
+
+
+def time_case(case: Case, repeats: int) -> Dict[str, Any]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        case.run()
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            case.run()
+            runs.append(time.perf_counter() - start)
+
+    median = statistics.median(runs)
+    result = {"median_s": median, "min_s": min(runs), "runs_s": runs}
+    if case.items is not None:
+        result.update({"items": case.items, "unit": case.unit, "per_second": case.items / median if median > 0 else None})
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="Suites to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="Use smaller inputs, e.g. for a smoke test")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    from src.services.checkpoint_service import CheckpointService
+
+    results = {}
+    cwd = os.getcwd()
+    checkpoint_dir = CheckpointService.CHECKPOINT_DIR
+    # The database and processed outputs are written to relative paths, so every suite runs in a
+    # scratch directory and the real data/outputs.sqlite is never touched. Checkpoints are located
+    # relative to the source tree instead, so they are redirected into the scratch directory too
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        os.makedirs("data", exist_ok=True)
+        CheckpointService.CHECKPOINT_DIR = os.path.join(scratch, "data", "checkpoints")
+        try:
+            for suite in args.only or list(SUITES):
+                for case in SUITES[suite](args.quick):
+                    result = time_case(case, args.repeats)
+                    results[case.name] = result
+                    line = f"{case.name:<45} {result['median_s'] * 1000:10.1f} ms"
+                    if result.get("per_second"):
+                        line += f"   {result['per_second']:12,.0f} {case.unit}/s"
+                    print(line)
+        finally:
+            os.chdir(cwd)
+            CheckpointService.CHECKPOINT_DIR = checkpoint_dir
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "repeats": args.repeats,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
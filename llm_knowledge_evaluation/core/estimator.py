@@ -68,15 +68,16 @@ class Estimator:
         for custom_id, prompt in tqdm(prompts, desc=f"Estimating {self.variable}"):
             location = custom_id.split("_")[0]
             meta = metadata.get(custom_id, {})
+            estimations = []
             for trial in range(self.n_trials):
                 try:
-                    response = self.model.generate_json(prompt, self.schema, n_attempts=1)
+                    response = self.model.generate_json(prompt, self.schema, n_attempts=1, sample=trial)
                     value = response.get(self.variable) if self.variable == "population_size" else response.get("percentage")
                     pred = float(value) if is_number(value) else None
                 except Exception:
                     pred = None
 
-                self.estimation_repo.insert_estimation({
+                estimations.append({
                     "run_id": self.run_id,
                     "variable": self.variable,
                     "location": location,
@@ -87,6 +88,7 @@ class Estimator:
                     "prediction": pred,
                     "timestamp": datetime.now().isoformat()
                 })
+            self.estimation_repo.insert_estimations(estimations)
 
 
     def get_batch_prompts_and_metadata(self) -> tuple[list[tuple[str, str]], dict[str, dict]]:
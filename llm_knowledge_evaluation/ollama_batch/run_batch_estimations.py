@@ -2,6 +2,7 @@ import traceback
 from src.llm_interface.model_factory import LLMFactory
 from llm_knowledge_evaluation.core.estimator import Estimator
 from src.llm_interface.ollama_model import OllamaModel
+from src.llm_interface.response_cache import ResponseCache
 
 VARIABLES = [
     # "age_distribution"
@@ -19,12 +20,18 @@ MODELS = [
     {"name": "qwen2.5:7b", "type": "ollama"},
 ]
 
+# "read_write", "read_only" or "bypass"
+CACHE_MODE = "read_write"
+
 def run_batch():
+    cache = ResponseCache(mode=CACHE_MODE)
+
     for variable in VARIABLES:
         for model_cfg in MODELS:
             try:
                 print(f"\nRunning estimation: {model_cfg['name']} on {variable}")
                 model = LLMFactory.get_provider(model_cfg["type"], model_name=model_cfg["name"], temperature=0)
+                model.use_response_cache(cache)
                 n_trials = 1
 
                 estimator = Estimator(
@@ -38,5 +45,7 @@ def run_batch():
                 print(f"❌ Failed: {model_cfg['name']} on {variable}")
                 traceback.print_exc()
 
+    print(f"[INFO] Response cache: {cache.stats()}")
+
 if __name__ == "__main__":
     run_batch()
\ No newline at end of file
@@ -2,25 +2,20 @@ import os
 import json
 import argparse
 from datetime import datetime
-import re
 from dotenv import load_dotenv
 import openai
 from src.repositories.estimation_metadata_repository import EstimationMetadataRepository
 from src.repositories.estimation_repository import EstimationRepository
+from src.utils.json_repair import parse_json
 
 load_dotenv("secrets.env")
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-def clean_json_block(raw: str) -> str:
-    cleaned = re.sub(r"^```(?:json)?\n?", "", raw.strip(), flags=re.IGNORECASE)
-    cleaned = re.sub(r"\n?```$", "", cleaned.strip())
-    cleaned = re.sub(r"(?<=\d),(?=\d)", "", cleaned)
-    return cleaned.strip()
-
 def parse_and_insert(jsonl_path, metadata: dict):
     repo = EstimationRepository()
     lookup = metadata["metadata"]
     variable = metadata["variable"]
+    rows = []
 
     with open(jsonl_path, "r") as f:
         for line in f:
@@ -31,17 +26,17 @@ def parse_and_insert(jsonl_path, metadata: dict):
                 meta = lookup.get(custom_id, {})
 
                 response = item.get("response", {})
-                content = clean_json_block(response.get("body", {}).get("choices", [{}])[0].get("message", {}).get("content", ""))
+                content = response.get("body", {}).get("choices", [{}])[0].get("message", {}).get("content", "")
 
                 try:
-                    data = json.loads(content)
+                    data = parse_json(content)
                     value = data.get("percentage")
                     pred = float(value) if isinstance(value, (int, float)) else None
                 except json.JSONDecodeError:
                     print(f"[WARN] Could not parse JSON for {custom_id}: {content}")
                     pred = None
 
-                repo.insert_estimation({
+                rows.append({
                     "run_id": metadata["run_id"],
                     "variable": variable,
                     "location": location,
@@ -55,6 +50,8 @@ def parse_and_insert(jsonl_path, metadata: dict):
             except Exception as e:
                 print(f"[WARN] Skipping record due to error: {e}")
 
+    repo.insert_estimations(rows)
+
 def insert_metadata(metadata: dict):
     meta_repo = EstimationMetadataRepository()
 
@@ -96,8 +93,9 @@ def main():
         f.write(result_stream.read())
 
     print(f"📥 Results downloaded to {result_path}")
-    parse_and_insert(result_path, metadata)
+    # Estimations reference their metadata row, so it must exist first
     insert_metadata(metadata)
+    parse_and_insert(result_path, metadata)
     print(f"✅ All predictions inserted into the database.")
 
 if __name__ == "__main__":
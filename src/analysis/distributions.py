@@ -1,4 +1,5 @@
 from collections import Counter
+import numpy as np
 import pandas as pd
 
 from src.utils.age_bands import assign_age_band
@@ -34,29 +35,37 @@ def compute_partner_age_diff_distribution(df: pd.DataFrame) -> dict:
     diffs = []
 
     for _, group in df.groupby("household_id"):
-        head = group[group["relationship"] == "Head"]
-        partners = group[group["relationship"].isin(["Partner", "Spouse"])]
+        diff = get_partner_age_diff(group["relationship"].to_numpy(), group["gender"].to_numpy(), group["age"].to_numpy())
+        if diff is not None:
+            diffs.append(diff)
 
-        if head.empty or partners.empty:
-            continue
+    return partner_age_diff_percentages(Counter(diffs), len(diffs))
 
-        head_gender = head.iloc[0]["gender"]
-        head_age = head.iloc[0]["age"]
-        partner_age = partners.iloc[0]["age"]
-        partner_gender = partners.iloc[0]["gender"]
 
-        if head_gender == "Male" and partner_gender == "Female":
-            diffs.append(head_age - partner_age)
-        elif head_gender == "Female" and partner_gender == "Male":
-            diffs.append(partner_age - head_age)
-        # Skip same-sex or invalid combinations
+def get_partner_age_diff(relationships: np.ndarray, genders: np.ndarray, ages: np.ndarray):
+    """
+    Returns the male minus the female age of a household's head and their partner,
+    given the members' columns in row order, or None if there is no mixed-sex head couple.
+    """
+    heads = np.flatnonzero(relationships == "Head")
+    partners = np.flatnonzero(np.isin(relationships, ["Partner", "Spouse"]))
 
-    counts = Counter(diffs)
-    total = sum(counts.values())
+    if len(heads) == 0 or len(partners) == 0:
+        return None
 
+    head, partner = heads[0], partners[0]
+    if genders[head] == "Male" and genders[partner] == "Female":
+        return ages[head] - ages[partner]
+    elif genders[head] == "Female" and genders[partner] == "Male":
+        return ages[partner] - ages[head]
+    # Skip same-sex or invalid combinations
+    return None
+
+
+def partner_age_diff_percentages(counts: Counter, total: int) -> dict:
+    """Converts counts of age differences to percentages over the -25..25 range."""
     full_range = range(-25, 26)
     return {
         k: round(100 * counts.get(k, 0) / total, 1) if total > 0 else 0.0
         for k in full_range
     }
-
@@ -0,0 +1,100 @@
+from collections import Counter
+from numbers import Number
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from src.classifiers.household_size.base import HouseholdSizeClassifier
+from src.classifiers.household_type.base import HouseholdCompositionClassifier
+from src.utils.age_bands import get_age_band
+
+
+class PopulationStatsAccumulator:
+    """
+    Keeps running counts of the statistics used in the feedback prompt.
+    Each household is classified once when it is added, so the observed distributions
+    can be rendered in O(#categories) instead of recomputing them over the whole population.
+    The distributions returned match those computed from the equivalent DataFrame.
+    """
+
+    def __init__(
+        self,
+        hh_size_classifier: HouseholdSizeClassifier,
+        hh_type_classifier: Optional[HouseholdCompositionClassifier] = None,
+        relationship_col: str = "relationship_to_head"
+    ):
+        self.hh_size_classifier = hh_size_classifier
+        self.hh_type_classifier = hh_type_classifier
+        self.relationship_col = relationship_col
+
+        self.n_households = 0
+        self.n_people = 0
+        self.size_counts = Counter()
+        self.composition_counts = Counter()
+        self.gender_counts = Counter()
+        self.age_band_counts = Counter()
+        self.occupation_counts = Counter()
+
+    def add_household(self, household: List[Dict[str, Any]]):
+        if not household:
+            return
+
+        self.n_households += 1
+        self.n_people += len(household)
+        self.size_counts[self.hh_size_classifier.classify_size(len(household))] += 1
+
+        if self.hh_type_classifier is not None:
+            label = self.hh_type_classifier.classify_household(pd.DataFrame(household), self.relationship_col)
+            self.composition_counts[label] += 1
+
+        for person in household:
+            gender = person.get("gender")
+            if isinstance(gender, str):
+                self.gender_counts[gender.capitalize()] += 1
+
+            age = person.get("age")
+            if isinstance(age, Number):
+                band = get_age_band(age)
+                if band is not None:
+                    self.age_band_counts[band] += 1
+
+            occupation_category = person.get("occupation_category")
+            if occupation_category is not None:
+                self.occupation_counts[occupation_category] += 1
+
+    def add_households(self, households: List[List[Dict[str, Any]]]):
+        for household in households:
+            self.add_household(household)
+
+    def household_size_distribution(self) -> Dict[Any, float]:
+        total = self.n_households
+        return {
+            size: round((self.size_counts.get(size, 0) / total) * 100, 2) if total > 0 else 0.00
+            for size in self.hh_size_classifier.get_categories()
+        }
+
+    def household_composition_distribution(self) -> Dict[str, float]:
+        return self._percentages(self.composition_counts)
+
+    def gender_distribution(self) -> Dict[str, float]:
+        return self._percentages(self.gender_counts, decimals=1)
+
+    def age_distribution(self) -> Dict[str, float]:
+        return self._percentages(self.age_band_counts, decimals=1)
+
+    def occupation_distribution(self) -> Dict[Any, float]:
+        return self._percentages(self.occupation_counts, decimals=1)
+
+    def average_household_size(self) -> float:
+        return self.n_people / self.n_households if self.n_households > 0 else 0.0
+
+    def _percentages(self, counts: Counter, decimals: Optional[int] = None) -> Dict[Any, float]:
+        """Converts counts to percentages, most common first, rounded like the DataFrame equivalents."""
+        items = counts.most_common()
+        if not items:
+            return {}
+        values = np.array([count for _, count in items], dtype=np.float64)
+        percentages = values / values.sum() * 100
+        if decimals is not None:
+            percentages = percentages.round(decimals)
+        return {key: float(pct) for (key, _), pct in zip(items, percentages)}
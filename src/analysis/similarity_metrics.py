@@ -1,3 +1,4 @@
+from collections import Counter
 from scipy.spatial.distance import jensenshannon
 import numpy as np
 import pandas as pd
@@ -7,7 +8,7 @@ from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
 from src.classifiers.household_type.base import HouseholdCompositionClassifier
 from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
 from src.services.file_service import FileService
-from src.analysis.distributions import compute_occupation_distribution, compute_partner_age_diff_distribution, compute_age_distribution, compute_gender_distribution
+from src.analysis.distributions import compute_occupation_distribution, compute_partner_age_diff_distribution, compute_age_distribution, compute_gender_distribution, get_partner_age_diff, partner_age_diff_percentages
 from src.utils.age_bands import assign_age_band, get_age_band_labels
 
 
@@ -35,6 +36,10 @@ def get_synthetic_age_pyramid(df: pd.DataFrame):
     syn_grouped = (
         synthetic_df.groupby(["age_group", "gender"], observed=False)["count"].sum().unstack().fillna(0)
     )
+    return _age_pyramid_percentages(syn_grouped)
+
+def _age_pyramid_percentages(syn_grouped: pd.DataFrame) -> pd.DataFrame:
+    """Converts an age group x gender table of counts into percentages of the whole population."""
     syn_pct = syn_grouped.divide(syn_grouped.sum().sum()).multiply(100)
     _, age_labels = get_age_band_labels()
     return syn_pct.reindex(age_labels).fillna(0)
@@ -63,58 +68,82 @@ def get_census_age_pyramid(df: pd.DataFrame):
 
     return grouped
 
+def load_census_distributions(location: str, include_occupation: bool) -> dict:
+    """Loads the census distributions compared against by compute_similarity_metrics."""
+    file_service = FileService()
+    census = {
+        "household_size": file_service.load_household_size(location),
+        "age_pyramid": get_census_age_pyramid(file_service.load_age_pyramid(location)),
+        "sex": file_service.load_sex_distribution(location),
+        "household_composition": file_service.load_household_composition(location),
+    }
+    if include_occupation:
+        census["occupation"] = file_service.load_occupation_distribution(location)
+    if "Newcastle" in location:
+        census["partner_age_diff"] = file_service.load_partner_age_diff(location)
+    return census
+
 def compute_similarity_metrics(df: pd.DataFrame, location: str, include_occupation: bool, hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(), hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier()):
-    hh_size_synth = list(hh_size_classifier.compute_observed_distribution(df).values())
-    hh_size_census = list(FileService().load_household_size(location).values())
+    census = load_census_distributions(location, include_occupation)
+
+    synthetic = {
+        "household_size": hh_size_classifier.compute_observed_distribution(df),
+        "age_pyramid": get_synthetic_age_pyramid(df),
+        "sex": compute_gender_distribution(df),
+        "household_composition": hh_type_classifier.compute_observed_distribution(df),
+    }
+    if include_occupation:
+        synthetic["occupation"] = compute_occupation_distribution(df)
+    if "Newcastle" in location:
+        # For Newcastle, we also compute partner age differences
+        synthetic["partner_age_diff"] = compute_partner_age_diff_distribution(df)
+
+    return _compare_distributions(synthetic, census, location, include_occupation, hh_type_classifier)
+
+def _compare_distributions(synthetic: dict, census: dict, location: str, include_occupation: bool, hh_type_classifier: HouseholdCompositionClassifier) -> pd.DataFrame:
+    """Computes the similarity metrics for each variable from synthetic and census distributions."""
+    hh_size_synth = list(synthetic["household_size"].values())
+    hh_size_census = list(census["household_size"].values())
     hh_size_result = compute_metrics(hh_size_synth, hh_size_census)
-    
-    age_synth = get_synthetic_age_pyramid(df).stack().to_list()
-    age_census = get_census_age_pyramid(FileService().load_age_pyramid(location)).stack().to_list()
+
+    age_synth = synthetic["age_pyramid"].stack().to_list()
+    age_census = census["age_pyramid"].stack().to_list()
     age_result = compute_metrics(age_synth, age_census)
-    
+
     # Compute separate age distribution metrics (aggregated across genders)
     # Reuse the age pyramid data but sum across genders
-    age_dist_synth_pyramid = get_synthetic_age_pyramid(df)
-    age_dist_census_pyramid = get_census_age_pyramid(FileService().load_age_pyramid(location))
-    
-    age_dist_synth_dict = (age_dist_synth_pyramid.sum(axis=1)).to_dict()
-    age_dist_census_dict = (age_dist_census_pyramid.sum(axis=1)).to_dict()
-    
+    age_dist_synth_dict = (synthetic["age_pyramid"].sum(axis=1)).to_dict()
+    age_dist_census_dict = (census["age_pyramid"].sum(axis=1)).to_dict()
+
     all_age_categories = sorted(set(age_dist_synth_dict.keys()).union(set(age_dist_census_dict.keys())))
     age_dist_synth = list({category: age_dist_synth_dict.get(category, 0.0) for category in all_age_categories}.values())
     age_dist_census = list({category: age_dist_census_dict.get(category, 0.0) for category in all_age_categories}.values())
     age_dist_result = compute_metrics(age_dist_synth, age_dist_census)
-    
+
     # Compute sex distribution metrics
-    sex_synth_dict = compute_gender_distribution(df)
-    sex_census_dict = FileService().load_sex_distribution(location)
+    sex_synth_dict = synthetic["sex"]
+    sex_census_dict = census["sex"]
     all_sex_categories = sorted(set(sex_synth_dict.keys()).union(set(sex_census_dict.keys())))
     sex_synth = list({category: sex_synth_dict.get(category, 0.0) for category in all_sex_categories}.values())
     sex_census = list({category: sex_census_dict.get(category, 0.0) for category in all_sex_categories}.values())
     sex_result = compute_metrics(sex_synth, sex_census)
 
     if include_occupation:
-        occupation_synth_dict = compute_occupation_distribution(df)
-        occupation_census_dict = FileService().load_occupation_distribution(location)
+        occupation_synth_dict = synthetic["occupation"]
+        occupation_census_dict = census["occupation"]
         all_categories = sorted(set(occupation_synth_dict.keys()).union(set(occupation_census_dict.keys())))
         occupation_synth = list({size: occupation_synth_dict.get(size, 0.0) for size in all_categories}.values())
         occupation_census = list({size: occupation_census_dict.get(size, 0.0) for size in all_categories}.values())
         occupation_result = compute_metrics(occupation_synth, occupation_census)
-    
+
     if "Newcastle" in location:
-        # For Newcastle, we also compute partner age differences
-        partner_age_diff_census = FileService().load_partner_age_diff(location)
-        partner_age_diff_synth = compute_partner_age_diff_distribution(df)
         partner_age_diff_result = compute_metrics(
-            list(partner_age_diff_synth.values()),
-            list(partner_age_diff_census.values())
+            list(synthetic["partner_age_diff"].values()),
+            list(census["partner_age_diff"].values())
         )
 
-    hh_type_synth = hh_type_classifier.compute_observed_distribution(df)
-    hh_type_census = FileService().load_household_composition(location)
-
     combined = pd.DataFrame(
-        {"Synthetic": hh_type_synth, "Census": hh_type_census}
+        {"Synthetic": synthetic["household_composition"], "Census": census["household_composition"]}
     ).fillna(0)
     label_order = hh_type_classifier.get_label_order()
     combined = combined.loc[[label for label in label_order if label in combined.index]]
@@ -173,12 +202,31 @@ def compute_aggregate_metrics(populations: list[pd.DataFrame], location: str, in
 
 
 def compute_convergence_curve(df, location, step=200, max_points=10000, include_occupation: bool = True, hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(), hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier()):
-    results = []
+    """
+    Computes the similarity metrics for the first i individuals, every `step` individuals.
+    The population is walked once in order: category counts are updated with the rows added
+    since the previous checkpoint, and only the households those rows belong to are re-classified.
+    Produces the same rows as calling compute_similarity_metrics on each prefix; prefixes whose
+    metrics cannot be computed are skipped.
+    """
+    checkpoints = range(step, min(len(df), max_points), step)
+    if len(checkpoints) == 0:
+        return pd.DataFrame()
+
+    try:
+        census = load_census_distributions(location, include_occupation)
+        prefix_distributions = _PrefixDistributions(
+            df.iloc[:checkpoints[-1]], include_occupation, "Newcastle" in location, hh_type_classifier, hh_size_classifier
+        )
+    except Exception:
+        # These fail identically for every prefix
+        return pd.DataFrame()
 
-    for i in range(step, min(len(df), max_points), step):
-        partial_df = df.iloc[:i]
+    results = []
+    for i in checkpoints:
         try:
-            metrics_df = compute_similarity_metrics(partial_df, location, include_occupation, hh_type_classifier, hh_size_classifier)
+            prefix_distributions.advance(i)
+            metrics_df = _compare_distributions(prefix_distributions.distributions(), census, location, include_occupation, hh_type_classifier)
             metrics_df["n_individuals"] = i
             results.append(metrics_df)
         except Exception as e:
@@ -188,3 +236,131 @@ def compute_convergence_curve(df, location, step=200, max_points=10000, include_
         return pd.DataFrame()
     
     return pd.concat(results).reset_index(drop=True)
+
+
+class _PrefixDistributions:
+    """
+    Cumulative category counts over a growing prefix of a population's rows.
+    Individual-level counts (age/gender, sex, occupation) only ever grow. Household-level
+    counts (size, composition, partner age difference) are kept per household, and a household
+    touched by new rows has its previous contribution removed before its new one is added.
+    """
+
+    def __init__(self, df: pd.DataFrame, include_occupation: bool, include_partner_age_diff: bool, hh_type_classifier: HouseholdCompositionClassifier, hh_size_classifier: HouseholdSizeClassifier):
+        self.df = df
+        self.include_occupation = include_occupation
+        self.include_partner_age_diff = include_partner_age_diff
+        self.hh_type_classifier = hh_type_classifier
+        self.hh_size_classifier = hh_size_classifier
+        self.position = 0
+
+        # Row positions of each household's members, in row order; rows without a household_id are ignored
+        self.household_codes, self.household_ids = pd.factorize(df["household_id"])
+        members = np.flatnonzero(self.household_codes >= 0)
+        self.members = members[np.argsort(self.household_codes[members], kind="stable")]
+        n_households = len(self.household_ids)
+        self.member_starts = np.r_[0, np.cumsum(np.bincount(self.household_codes[members], minlength=n_households))[:-1]]
+        self.prefix_sizes = np.zeros(n_households, dtype=np.int64)
+
+        self.age_bands = assign_age_band(df["age"]).astype(object).to_numpy()
+        self.genders = df["gender"].str.capitalize().to_numpy(dtype=object)
+        self.occupations = df["occupation_category"].to_numpy(dtype=object) if include_occupation else None
+        if include_partner_age_diff:
+            self.relationships = df["relationship"].to_numpy()
+            self.raw_genders = df["gender"].to_numpy()
+            self.ages = df["age"].to_numpy()
+
+        self.pyramid_counts = Counter()
+        self.sex_counts = Counter()
+        self.occupation_counts = Counter()
+
+        self.household_sizes = [None] * n_households
+        self.household_labels = [None] * n_households
+        self.partner_age_diffs = [None] * n_households
+        self.size_counts = Counter()
+        self.composition_counts = Counter()
+        self.partner_age_diff_counts = Counter()
+        self.n_partner_age_diffs = 0
+
+    def advance(self, end: int):
+        """Adds rows up to (but excluding) position `end`."""
+        start, self.position = self.position, end
+
+        for band, gender in zip(self.age_bands[start:end], self.genders[start:end]):
+            if pd.notna(gender):
+                self.sex_counts[gender] += 1
+                if pd.notna(band):
+                    self.pyramid_counts[(band, gender)] += 1
+        if self.include_occupation:
+            self.occupation_counts.update(o for o in self.occupations[start:end] if pd.notna(o))
+
+        new_codes = self.household_codes[start:end]
+        new_codes = new_codes[new_codes >= 0]
+        if len(new_codes) == 0:
+            return
+        self.prefix_sizes += np.bincount(new_codes, minlength=len(self.prefix_sizes))
+        self._reclassify(np.unique(new_codes))
+
+    def _reclassify(self, touched: np.ndarray):
+        rows = np.concatenate([
+            self.members[self.member_starts[h]:self.member_starts[h] + self.prefix_sizes[h]] for h in touched
+        ])
+        labels = self.hh_type_classifier.classify_households(self.df.iloc[rows], "relationship")
+        labels = labels.reindex(self.household_ids[touched]).tolist()
+
+        for h, label in zip(touched, labels):
+            size = self.hh_size_classifier.classify_size(int(self.prefix_sizes[h]))
+            self._replace(self.size_counts, self.household_sizes, h, size)
+            self._replace(self.composition_counts, self.household_labels, h, label)
+
+        if self.include_partner_age_diff:
+            for h in touched:
+                member_rows = self.members[self.member_starts[h]:self.member_starts[h] + self.prefix_sizes[h]]
+                diff = get_partner_age_diff(self.relationships[member_rows], self.raw_genders[member_rows], self.ages[member_rows])
+                previous = self.partner_age_diffs[h]
+                if previous is not None:
+                    self.partner_age_diff_counts[previous] -= 1
+                    self.n_partner_age_diffs -= 1
+                if diff is not None:
+                    self.partner_age_diff_counts[diff] += 1
+                    self.n_partner_age_diffs += 1
+                self.partner_age_diffs[h] = diff
+
+    @staticmethod
+    def _replace(counts: Counter, current: list, h: int, value):
+        if current[h] is not None:
+            counts[current[h]] -= 1
+        counts[value] += 1
+        current[h] = value
+
+    def distributions(self) -> dict:
+        """Returns the synthetic distributions of the current prefix, as compute_similarity_metrics computes them."""
+        total_households = sum(self.size_counts.values())
+        synthetic = {
+            "household_size": {
+                size: round((self.size_counts.get(size, 0) / total_households) * 100, 2) if total_households > 0 else 0.00
+                for size in self.hh_size_classifier.get_categories()
+            },
+            "age_pyramid": self._age_pyramid(),
+            "sex": self._percentages(self.sex_counts).round(1).to_dict(),
+            "household_composition": self._percentages(self.composition_counts).to_dict(),
+        }
+        if self.include_occupation:
+            synthetic["occupation"] = self._percentages(self.occupation_counts).round(1).to_dict()
+        if self.include_partner_age_diff:
+            synthetic["partner_age_diff"] = partner_age_diff_percentages(self.partner_age_diff_counts, self.n_partner_age_diffs)
+        return synthetic
+
+    def _age_pyramid(self) -> pd.DataFrame:
+        _, age_labels = get_age_band_labels()
+        genders = sorted({gender for (_, gender), count in self.pyramid_counts.items() if count > 0})
+        syn_grouped = pd.DataFrame(0, index=age_labels, columns=genders)
+        for (band, gender), count in self.pyramid_counts.items():
+            syn_grouped.loc[band, gender] = count
+        return _age_pyramid_percentages(syn_grouped)
+
+    @staticmethod
+    def _percentages(counts: Counter) -> pd.Series:
+        """Equivalent of value_counts(normalize=True) * 100 over the counted values."""
+        counts = pd.Series({key: count for key, count in counts.items() if count > 0}, dtype=np.int64)
+        return counts / counts.sum() * 100
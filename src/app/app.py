@@ -2,17 +2,14 @@ import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
 from src.analysis.diversity_and_validity import compute_generation_validity, compute_household_structure_diversity, compute_individual_diversity
-from src.classifiers.household_size.dar_es_salaam import DarEsSalaamHouseholdSizeClassifier
-from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
-from src.classifiers.household_size.un_global import UNHouseholdSizeClassifier
-from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
-from src.classifiers.household_type.un_global import UNHouseholdCompositionClassifier
+from src.classifiers.registry import get_household_composition_classifier, get_household_size_classifier
 from src.services.experiment_run_service import ExperimentRunService
 from src.services.experiments_service import ExperimentService
 from src.analysis.distributions import compute_occupation_distribution
 from src.services.population_service import PopulationService
 from src.services.metadata_service import MetadataService
 from src.services.file_service import FileService
+from src.services.timings_service import TimingsService
 from src.utils.colour_generator import assign_household_colors
 from src.utils.plots import plot_age_pyramid, plot_categories, plot_household_structure_bar, plot_occupation_titles, plot_age_diff
 import os
@@ -21,15 +18,6 @@ import altair as alt
 from src.analysis.similarity_metrics import compute_aggregate_metrics, compute_convergence_curve, compute_similarity_metrics, get_census_age_pyramid, get_synthetic_age_pyramid
 from src.utils.aggregate_plots import plot_age_pyramid_aggregate, plot_household_size_aggregate, plot_household_structure_bar_aggregate, plot_occupations_aggregate
 
-def get_household_size_classifier(experiment):
-    if experiment['hh_size_classifier'] == 'un_global':
-        return UNHouseholdSizeClassifier()
-    elif experiment['hh_size_classifier'] == 'dar_es_salaam':
-        return DarEsSalaamHouseholdSizeClassifier()
-    else:
-        return UKHouseholdSizeClassifier()
-
-
 st.set_page_config(layout="wide")
 
 file_service = FileService()
@@ -37,6 +25,7 @@ metadata_service = MetadataService()
 population_service = PopulationService()
 experiment_service = ExperimentService()
 experiment_runs_service = ExperimentRunService()
+timings_service = TimingsService()
 
 st.title("📊 Population Browser")
 
@@ -49,8 +38,8 @@ else:
     selected_exp_label = st.selectbox("Select an Experiment:", list(experiment_dict.keys()))
     selected_experiment_id = experiment_dict[selected_exp_label]
     selected_experiment = experiment_service.get_by_id(selected_experiment_id)
-    hh_type_classifier = UNHouseholdCompositionClassifier() if selected_experiment["hh_type_classifier"] == "un_global" else UKHouseholdCompositionClassifier()
-    hh_size_classifier = get_household_size_classifier(selected_experiment)
+    hh_type_classifier = get_household_composition_classifier(selected_experiment["hh_type_classifier"])
+    hh_size_classifier = get_household_size_classifier(selected_experiment["hh_size_classifier"])
     location = selected_experiment["location"].replace(" ", "_")
     runs = experiment_runs_service.get_by_experiment_id(selected_experiment_id)
 
@@ -100,6 +89,14 @@ else:
             else:
                 st.warning("No valid population data available for aggregate analysis.")
 
+            run_usage = timings_service.get_usage_by_experiment_id(selected_experiment_id)
+            if run_usage:
+                st.subheader("🪙 Token Usage per Run")
+                usage_df = pd.DataFrame(run_usage)
+                st.dataframe(usage_df.drop(columns=["population_id"]), hide_index=True)
+                if usage_df["cost"].notna().any():
+                    st.markdown(f"**Estimated experiment cost:** ${usage_df['cost'].sum():.2f}")
+
         with tab1:
 
             # Fetch and display metadata
@@ -120,6 +117,48 @@ else:
                 st.write(f"Displaying **{len(df)} individuals** from **Population ID: {selected_population_id}**")
                 st.dataframe(styled_df, column_order=('name', 'age', 'gender', 'occupation_category', 'occupation', 'relationship'))
 
+            timing_rows = timings_service.get_by_population_id(selected_population_id)
+            if timing_rows:
+                st.subheader("⏱️ Generation Timings")
+                timings_df = pd.DataFrame(timing_rows)
+                stage_totals = timings_df.groupby("stage", as_index=False)[["count", "total_seconds"]].sum()
+                st.dataframe(stage_totals.sort_values("total_seconds", ascending=False), hide_index=True)
+
+                # Requests run concurrently, so their summed time can exceed a batch's wall-clock time
+                batch_stages = timings_df[timings_df["batch"].notna() & (timings_df["stage"] != "batch")]
+                chart_timings = alt.Chart(batch_stages).mark_bar().encode(
+                    x="batch:O",
+                    y=alt.Y("total_seconds:Q", title="seconds"),
+                    color="stage:N",
+                    tooltip=["batch", "stage", "count", "total_seconds", "max_seconds"]
+                ).properties(width=750, height=400)
+                batch_wall_time = alt.Chart(timings_df[timings_df["stage"] == "batch"]).mark_line(color="black", point=True).encode(
+                    x="batch:O",
+                    y="total_seconds:Q"
+                )
+                st.altair_chart(chart_timings + batch_wall_time, use_container_width=True)
+                st.caption("Bars: time per stage, summed over concurrent requests. Line: wall-clock time of each batch.")
+
+            batch_usage = timings_service.get_usage_by_population_id(selected_population_id)
+            if batch_usage:
+                st.subheader("🪙 Token Usage")
+                batch_usage_df = pd.DataFrame(batch_usage)
+                if batch_usage_df["cost"].notna().any():
+                    st.markdown(f"**Estimated run cost:** ${batch_usage_df['cost'].sum():.2f}")
+                # Prompt tokens per batch grow with the statistics fed back into the prompt
+                tokens_long = batch_usage_df[batch_usage_df["batch"].notna()].melt(
+                    id_vars=["batch"],
+                    value_vars=["prompt_tokens", "completion_tokens", "cached_tokens"],
+                    var_name="Tokens",
+                    value_name="Count"
+                )
+                chart_tokens = alt.Chart(tokens_long).mark_line(point=True).encode(
+                    x="batch:O",
+                    y="Count:Q",
+                    color="Tokens:N"
+                ).properties(width=750, height=400)
+                st.altair_chart(chart_tokens, use_container_width=True)
+
         with tab2:
             report_path = os.path.join("reports", f"{selected_population_id}.html")
             report_html = file_service.load_html_report(report_path)
@@ -181,7 +220,7 @@ else:
             if not df.empty:
                 try:
                     age_dist_synth_pyramid = get_synthetic_age_pyramid(df)
-                    age_dist_census_pyramid = get_census_age_pyramid(FileService().load_age_pyramid(location))
+                    age_dist_census_pyramid = get_census_age_pyramid(file_service.load_age_pyramid(location))
                     age_dist_synth = (age_dist_synth_pyramid.sum(axis=1)).to_dict()
                     age_dist_census = (age_dist_census_pyramid.sum(axis=1)).to_dict()
 
@@ -12,6 +12,16 @@ class HouseholdSizeClassifier(ABC):
         """Computes the observed distribution from synthetic data."""
         pass
 
+    @abstractmethod
+    def get_categories(self) -> List:
+        """Returns the size categories reported by compute_observed_distribution, in order."""
+        pass
+
+    @abstractmethod
+    def classify_size(self, size: int):
+        """Maps a household size to its category."""
+        pass
+
     def compute_average_household_size(self, synthetic_df: pd.DataFrame) -> float:
         """Computes the average household size from synthetic data."""
         household_sizes = synthetic_df.groupby("household_id").size()
@@ -1,5 +1,5 @@
 from .base import HouseholdSizeClassifier
-from typing import Dict
+from typing import Dict, List
 import pandas as pd
 
 
@@ -9,10 +9,17 @@ class DarEsSalaamHouseholdSizeClassifier(HouseholdSizeClassifier):
 
     def compute_observed_distribution(self, synthetic_df: pd.DataFrame) -> Dict[str, float]:
         household_sizes = synthetic_df.groupby("household_id").size()
-        household_sizes = household_sizes.apply(lambda x: x if x <= 9 else 9)
+        household_sizes = household_sizes.apply(self.classify_size)
         size_counts = household_sizes.value_counts().to_dict()
         total = sum(size_counts.values())
         return {
             size: round((size_counts.get(size, 0) / total) * 100, 2) if total > 0 else 0.00
-            for size in range(1, 10)
-        } 
+            for size in self.get_categories()
+        }
+
+    def get_categories(self) -> List[int]:
+        return list(range(1, 10))
+
+    def classify_size(self, size: int) -> int:
+        return size if size <= 9 else 9
+
@@ -12,6 +12,16 @@ class HouseholdCompositionClassifier(ABC):
         """Computes the observed distribution from synthetic data."""
         pass
 
+    @abstractmethod
+    def classify_household(self, group: pd.DataFrame, relationship_col: str = "relationship") -> str:
+        """Returns the label reported by compute_observed_distribution for a single household."""
+        pass
+
+    @abstractmethod
+    def classify_households(self, synthetic_df: pd.DataFrame, relationship_col: str = "relationship") -> pd.Series:
+        """Returns the label of every household at once, indexed by household_id."""
+        pass
+
     @abstractmethod
     def get_label_order(self) -> List[str]:
         pass
\ No newline at end of file
@@ -0,0 +1,54 @@
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+
+def household_role_summary(synthetic_df: pd.DataFrame, relationship_col: str, roles: Iterable[str]) -> pd.DataFrame:
+    """
+    Summarises each household in one pass, indexed by household_id (sorted, as groupby does).
+
+    Columns:
+    - n: number of members, including members with a missing relationship
+    - one count column per role in `roles`
+    - children_under_18 / siblings_under_18: members with that relationship aged under 18
+    - head_age: age of the first member listed as Head (NaN if there is none)
+    """
+    roles = list(dict.fromkeys(roles))
+    household_codes, household_ids = pd.factorize(synthetic_df["household_id"], sort=True)
+    n_households = len(household_ids)
+    # Members with a missing household_id are dropped, as groupby does
+    members = household_codes >= 0
+    household_codes = household_codes[members]
+
+    relationships = synthetic_df[relationship_col].to_numpy(dtype=object)[members]
+    if "age" in synthetic_df:
+        ages = pd.to_numeric(synthetic_df["age"], errors="coerce").to_numpy(dtype=np.float64)[members]
+    else:
+        ages = np.full(len(household_codes), np.nan)
+
+    # Relationships outside `roles` (and missing ones) get code -1
+    role_codes = pd.Categorical(relationships, categories=roles).codes.astype(np.int64)
+    counted = role_codes >= 0
+    role_counts = np.bincount(
+        household_codes[counted] * len(roles) + role_codes[counted],
+        minlength=n_households * len(roles)
+    ).reshape(n_households, len(roles))
+
+    summary = pd.DataFrame(role_counts, index=pd.Index(household_ids, name="household_id"), columns=roles)
+    summary.insert(0, "n", np.bincount(household_codes, minlength=n_households))
+
+    under_18 = ages < 18
+    for column, role in [("children_under_18", "Child"), ("siblings_under_18", "Sibling")]:
+        summary[column] = np.bincount(household_codes[(relationships == role) & under_18], minlength=n_households)
+
+    head_rows = np.flatnonzero(relationships == "Head")
+    head_households, first = np.unique(household_codes[head_rows], return_index=True)
+    head_age = np.full(n_households, np.nan)
+    head_age[head_households] = ages[head_rows[first]]
+    summary["head_age"] = head_age
+    return summary
+
+
+def count_outside(summary: pd.DataFrame, allowed_roles: Iterable[str]) -> pd.Series:
+    """Number of members per household whose relationship is not one of `allowed_roles`."""
+    return summary["n"] - summary[list(allowed_roles)].sum(axis=1)
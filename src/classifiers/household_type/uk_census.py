@@ -1,5 +1,7 @@
 from .base import HouseholdCompositionClassifier
+from .role_summary import count_outside, household_role_summary
 from typing import Dict
+import numpy as np
 import pandas as pd
 
 
@@ -11,15 +13,62 @@ class UKHouseholdCompositionClassifier(HouseholdCompositionClassifier):
         label_map = self.label_map()
 
         # Compute household-level classifications
-        household_labels = synthetic_df.groupby("household_id").apply(
-            lambda x: self.classify_household_structure(x, relationship_col)
-        )
+        household_labels = self.classify_household_structures(synthetic_df, relationship_col)
         synthetic_counts = household_labels.value_counts(normalize=True) * 100
 
         # Map internal labels to census categories
         synthetic_counts.index = synthetic_counts.index.map(lambda x: label_map.get(x, x))
         return synthetic_counts.to_dict()
 
+    def classify_household(self, group: pd.DataFrame, relationship_col: str = "relationship") -> str:
+        label = self.classify_household_structure(group, relationship_col)
+        return self.label_map().get(label, label)
+
+    def classify_households(self, synthetic_df: pd.DataFrame, relationship_col: str = "relationship") -> pd.Series:
+        label_map = self.label_map()
+        return self.classify_household_structures(synthetic_df, relationship_col).map(lambda x: label_map.get(x, x))
+
+    def classify_household_structures(self, synthetic_df: pd.DataFrame, relationship_col: str = "relationship") -> pd.Series:
+        """
+        Vectorised equivalent of classify_household_structure over every household,
+        evaluated as boolean rules on a per-household role summary.
+        """
+        summary = household_role_summary(synthetic_df, relationship_col, ["Head", "Partner", "Spouse", "Child", "Parent", "Sibling"])
+        n = summary["n"]
+        head_age = summary["head_age"]
+        has_partner = (summary["Partner"] + summary["Spouse"]) > 0
+        family_only = count_outside(summary, ["Head", "Partner", "Spouse", "Child"]) == 0
+        reverse_family_only = count_outside(summary, ["Head", "Parent", "Sibling"]) == 0
+        couple = family_only & has_partner
+        two_parents = reverse_family_only & (summary["Parent"] == 2)
+
+        conditions = [
+            summary["Head"] == 0,
+            (n == 1) & (head_age >= 66),
+            n == 1,
+            couple & (summary["Child"] == 0),
+            couple & (summary["children_under_18"] > 0),
+            couple,
+            family_only,
+            reverse_family_only & (summary["Parent"] == 1),
+            two_parents & ((head_age < 18) | (summary["siblings_under_18"] > 0)),
+            two_parents,
+        ]
+        choices = [
+            "No head of household",
+            "One-person household: Aged 66 years and over",
+            "One-person household: Other",
+            "Single family household: Couple family household: No children",
+            "Single family household: Couple family household: Dependent children",
+            "Single family household: Couple family household: All children non-dependent",
+            "Single family household: Lone parent household",
+            "Single family household: Lone parent household",
+            "Single family household: Couple family household: Dependent children",
+            "Single family household: Couple family household: All children non-dependent",
+        ]
+        labels = np.select(conditions, choices, default="Other household types")
+        return pd.Series(labels, index=summary.index, dtype=object)
+
     def classify_household_structure(self, group: pd.DataFrame, relationship_col: str = "relationship") -> str:
         n = len(group)
         roles = set(group[relationship_col])
@@ -1,17 +1,61 @@
 from .base import HouseholdCompositionClassifier
+from .role_summary import count_outside, household_role_summary
 from typing import Dict
+import numpy as np
 import pandas as pd
 
+RELATIVE_ROLES = [
+    "Head", "Spouse", "Partner", "Child", "Child-in-law",
+    "Parent", "Sibling", "Sibling-in-law",
+    "Grandchild", "Grandparent", "Aunt", "Uncle",
+    "Nephew", "Niece", "Cousin"
+]
+
 
 class UNHouseholdCompositionClassifier(HouseholdCompositionClassifier):
     def get_name(self):
         return 'un_global'
 
     def compute_observed_distribution(self, synthetic_df: pd.DataFrame, relationship_col: str = "relationship") -> Dict[str, float]:
-        household_labels = synthetic_df.groupby("household_id").apply(lambda x: self.classify_household_structure(x, relationship_col))
+        household_labels = self.classify_households(synthetic_df, relationship_col)
         counts = household_labels.value_counts(normalize=True) * 100
         return counts.to_dict()
 
+    def classify_household(self, group: pd.DataFrame, relationship_col: str = "relationship") -> str:
+        return self.classify_household_structure(group, relationship_col)
+
+    def classify_households(self, synthetic_df: pd.DataFrame, relationship_col: str = "relationship") -> pd.Series:
+        """
+        Vectorised equivalent of classify_household_structure over every household,
+        evaluated as boolean rules on a per-household role summary.
+        """
+        summary = household_role_summary(synthetic_df, relationship_col, RELATIVE_ROLES)
+        n = summary["n"]
+        has_partner = (summary["Spouse"] + summary["Partner"]) > 0
+        has_child = summary["Child"] > 0
+        reverse_family = ~has_partner & ~has_child & (count_outside(summary, ["Head", "Parent", "Sibling"]) == 0)
+
+        conditions = [
+            n == 1,
+            (n == 2) & has_partner,
+            has_partner & has_child & (count_outside(summary, ["Head", "Spouse", "Partner", "Child"]) == 0),
+            ~has_partner & has_child & (count_outside(summary, ["Head", "Child"]) == 0),
+            reverse_family & (summary["Parent"] == 2),
+            reverse_family & (summary["Parent"] == 1),
+            count_outside(summary, RELATIVE_ROLES) == 0,
+        ]
+        choices = [
+            "One-person",
+            "Couple",
+            "Couple with children",
+            "Lone parent",
+            "Couple with children",
+            "Lone parent",
+            "Extended family",
+        ]
+        labels = np.select(conditions, choices, default="Non-relatives")
+        return pd.Series(labels, index=summary.index, dtype=object)
+
     def classify_household_structure(self, group: pd.DataFrame, relationship_col: str = "relationship") -> str:
         roles = group[relationship_col].tolist()
         n = len(roles)
@@ -45,15 +89,7 @@ class UNHouseholdCompositionClassifier(HouseholdCompositionClassifier):
                     return "Lone parent"
 
         # Extended family: all members are relatives
-        all_relatives = all(
-            r in {
-                "Head", "Spouse", "Partner", "Child", "Child-in-law",
-                "Parent", "Sibling", "Sibling-in-law",
-                "Grandchild", "Grandparent", "Aunt", "Uncle",
-                "Nephew", "Niece", "Cousin"
-            }
-            for r in roles
-        )
+        all_relatives = all(r in RELATIVE_ROLES for r in roles)
         if all_relatives:
             return "Extended family"
 
@@ -0,0 +1,25 @@
+from src.classifiers.household_size.base import HouseholdSizeClassifier
+from src.classifiers.household_size.dar_es_salaam import DarEsSalaamHouseholdSizeClassifier
+from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
+from src.classifiers.household_size.un_global import UNHouseholdSizeClassifier
+from src.classifiers.household_type.base import HouseholdCompositionClassifier
+from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
+from src.classifiers.household_type.un_global import UNHouseholdCompositionClassifier
+
+
+def get_household_size_classifier(name: str) -> HouseholdSizeClassifier:
+    """Returns the household size classifier stored under `name` (see get_name())."""
+    if name == "un_global":
+        return UNHouseholdSizeClassifier()
+    elif name == "dar_es_salaam":
+        return DarEsSalaamHouseholdSizeClassifier()
+    else:
+        return UKHouseholdSizeClassifier()
+
+
+def get_household_composition_classifier(name: str) -> HouseholdCompositionClassifier:
+    """Returns the household composition classifier stored under `name` (see get_name())."""
+    if name == "un_global":
+        return UNHouseholdCompositionClassifier()
+    else:
+        return UKHouseholdCompositionClassifier()
@@ -1,8 +1,8 @@
 from azure.ai.inference import ChatCompletionsClient
 from azure.core.credentials import AzureKeyCredential
 from src.llm_interface.base_llm import BaseLLM
+from src.utils.json_repair import strip_reasoning
 from azure.ai.inference.models import SystemMessage, UserMessage
-import re
 
 class AzureModel(BaseLLM):
     is_local = False
@@ -38,8 +38,9 @@ class AzureModel(BaseLLM):
             top_p=self.top_p
         )
 
-        print(response.usage)
-        
+        if response.usage is not None:
+            self.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+
         raw_output = response.choices[0].message.content.strip()
-        return re.sub(r"<think>.*?</think>", "", raw_output, flags=re.DOTALL).strip()
+        return strip_reasoning(raw_output)
 
@@ -1,8 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
 import json
 import jsonschema
+import threading
 import time
+from src.llm_interface.rate_limiter import RateLimiter, jitter, throttle_signal
+from src.llm_interface.request_budget import RequestBudget
+from src.llm_interface.response_cache import ResponseCache
+from src.utils.json_repair import parse_and_validate, parse_json
+from src.utils.schema_validator import get_array_schema, get_validator
+from src.utils.timing import CACHE_HIT, JSON_PARSE, LLM_REQUEST, RETRY, SCHEMA_VALIDATION, Timings, add_tokens, count, span
 
 class BaseLLM(ABC):
     """
@@ -13,13 +22,25 @@ class BaseLLM(ABC):
     """
 
     is_local = False
+    # Providers that can constrain their output to a JSON Schema set this and accept
+    # a `json_schema` keyword in generate_text; the others rely on validation and retries.
+    supports_json_schema = False
     model_name: str
     temperature: float
+    response_cache: Optional[ResponseCache] = None
+    request_budget: Optional[RequestBudget] = None
+    rate_limiter: Optional[RateLimiter] = None
+    # Failed requests are resent after retry_backoff * 2^(attempt - 1) seconds (with jitter), at most max_backoff
+    retry_backoff: float = 1.0
+    max_backoff: float = 30.0
+    # Token usage of the calling thread's latest request, reported by the provider through record_usage
+    _usage = threading.local()
 
     @abstractmethod
     def generate_text(self, prompt: str | list[str], timeout: int) -> str | list[str]:
         """
         Subclasses must implement how to call the LLM and return a raw text response.
+        Single-prompt calls may be issued concurrently from worker threads by generate_batch_json.
         """
         raise NotImplementedError
         
@@ -27,28 +48,60 @@ class BaseLLM(ABC):
     def get_model_metadata(self) -> str:
         raise NotImplementedError
 
+    def use_response_cache(self, cache: Optional[ResponseCache]):
+        """Routes generate_json and generate_batch_json through an on-disk response cache (None disables it)."""
+        self.response_cache = cache
+
+    def use_request_budget(self, budget: Optional[RequestBudget]):
+        """Makes every LLM call wait for the shared per-provider budget (None removes the limit)."""
+        self.request_budget = budget
+
+    def use_rate_limiter(self, limiter: Optional[RateLimiter]):
+        """Draws every LLM call from a shared requests/tokens per minute limiter (None removes it)."""
+        self.rate_limiter = limiter
+
+    def record_usage(self, prompt_tokens: Optional[int] = 0, completion_tokens: Optional[int] = 0, cached_tokens: Optional[int] = 0):
+        """
+        Providers call this from generate_text with the token counts their API reports for the request.
+        Cached tokens are the part of the prompt served from the provider's prompt cache.
+        """
+        BaseLLM._usage.tokens = (prompt_tokens or 0, completion_tokens or 0, cached_tokens or 0)
+
     def generate_json(
         self,
         prompt: str,
         json_schema: Dict[str, Any],
         n_attempts: int = 3,
-        timeout: int = 30
+        timeout: int = 30,
+        sample: int = 0,
+        timings: Optional[Timings] = None
     ) -> Dict[str, Any]:
+        """
+        Generates a single schema-valid JSON response. `sample` selects which cached
+        response to replay when the same prompt is requested several times.
+        Requests, parsing, validation and retries are recorded on `timings` when given.
+        """
 
         attempts = 0
         current_prompt = prompt
 
         while attempts < n_attempts:
+            if attempts > 0:
+                count(timings, RETRY)
             try:
-                raw_response = self.generate_text(current_prompt, timeout).strip()
+                raw_response, from_cache = self._generate_text_cached(current_prompt, timeout, sample, json_schema, timings)
+                raw_response = raw_response.strip()
             except Exception as e:
                 attempts += 1
                 print(f"Failed to generate response: {str(e)}.  Retrying...")
+                if attempts < n_attempts:
+                    time.sleep(self._backoff(attempts))
                 continue
 
             try:
-                data = json.loads(raw_response)
-                jsonschema.validate(instance=data, schema=json_schema)
+                data = parse_and_validate(raw_response, get_validator(json_schema), timings)
+                if not from_cache:
+                    self._cache_response(current_prompt, raw_response, sample, json_schema)
                 return data
 
             except Exception as e:
@@ -66,50 +119,237 @@ class BaseLLM(ABC):
 
         return []
 
-    def generate_batch_json(self, prompts: List[str], json_schema: Dict[str, Any], max_parallel=4, n_attempts: int = 3, timeout=30) -> List[Dict[str, Any]]:
+    def generate_batch_json(self, prompts: List[str], json_schema: Dict[str, Any], max_parallel=4, n_attempts: int = 3, timeout=30, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
+        """
+        Generates one JSON response per prompt, keeping up to `max_parallel` requests in flight.
+        Failed requests and correction prompts are sent back into the same window, and the
+        valid households are returned in the order of their input prompts.
+        Requests, parsing, validation and retries are recorded on `timings` when given.
+        """
+        validator = get_validator(json_schema)
+        results: List[Any] = [None] * len(prompts)
+
+        # Repeated prompts within a batch are cached as separate samples
+        samples = []
+        occurrences: Dict[str, int] = {}
+        for prompt in prompts:
+            samples.append(occurrences.get(prompt, 0))
+            occurrences[prompt] = samples[-1] + 1
+
+        batch_start = time.time()
+        print(f"[INFO] Generating {len(prompts)} households with up to {max_parallel} requests in flight")
+
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            in_flight = {}
+
+            def submit(index: int, current_prompt: str, attempt: int, delay: float = 0.0):
+                future = executor.submit(self._generate_text_cached, current_prompt, timeout, samples[index], json_schema, timings, delay)
+                in_flight[future] = (index, current_prompt, attempt)
+
+            for index, prompt in enumerate(prompts):
+                submit(index, prompt, 1)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, current_prompt, attempt = in_flight.pop(future)
+                    retry_prompt = None
+                    retry_delay = 0.0
+
+                    try:
+                        response, from_cache = future.result()
+                    except Exception as e:
+                        print(f"[ERROR] Generation failed: {e}")
+                        retry_prompt = current_prompt
+                        retry_delay = self._backoff(attempt)
+                    else:
+                        if response is None:
+                            print(f"[WARNING] Missing response. Retrying...")
+                            retry_prompt = current_prompt
+                        else:
+                            try:
+                                data = parse_and_validate(response, validator, timings)
+                                results[index] = data["household"]
+                                if not from_cache:
+                                    self._cache_response(current_prompt, response, samples[index], json_schema)
+                            except (json.JSONDecodeError, jsonschema.ValidationError) as e:
+                                print(e)
+                                print(response)
+                                print(f"[ERROR] Response validation failed. Retrying...")
+                                retry_prompt = self._build_correction_prompt(prompts[index], response, f"Validation error: {e}", json_schema)
+
+                    if retry_prompt is not None:
+                        if attempt < n_attempts:
+                            count(timings, RETRY)
+                            print(f"[INFO] Regenerating household {index + 1} (attempt {attempt + 1} of {n_attempts})")
+                            submit(index, retry_prompt, attempt + 1, retry_delay)
+                        else:
+                            print(f"[WARNING] Giving up on household {index + 1} after {n_attempts} attempts.")
 
-        failed_prompts = list(prompts)
-        valid_responses = []
+        batch_end = time.time()
+        print(f"[INFO] Batch completed in {batch_end - batch_start:.2f} seconds.\n\n")
 
-        for attempt in range(n_attempts):
-            if not failed_prompts:
-                break
+        return [result for result in results if result is not None]
 
-            new_failed_prompts = []
-            batch_start = time.time()
+    def generate_grouped_json(
+        self,
+        build_prompt: Callable[[List[int]], str],
+        n_items: int,
+        item_schema: Dict[str, Any],
+        items_per_request: int,
+        items_key: str = "households",
+        max_parallel: int = 4,
+        n_attempts: int = 3,
+        timeout: int = 30,
+        timings: Optional[Timings] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generates n_items JSON objects, asking for up to `items_per_request` of them in each request.
+        `build_prompt` receives the item indices a request covers and returns its prompt; the response
+        must be an object with one item per index under `items_key`. Items are validated individually
+        against `item_schema`, and only the missing or invalid ones are requested again.
+        Returns the valid items in index order. Requests, parsing, validation and retries are
+        recorded on `timings` when given.
+        """
+        item_validator = get_validator(item_schema)
+        response_schema = get_array_schema(item_schema, items_key)
+        results: List[Any] = [None] * n_items
+        groups = [list(range(start, min(start + items_per_request, n_items))) for start in range(0, n_items, max(1, items_per_request))]
 
-            for i in range(0, len(failed_prompts), max_parallel):
-                print(f"[INFO] {"Generating" if attempt == 0 else "Regenerating"} households {i + 1} to {i + max_parallel}")
-                batch_prompts = failed_prompts[i : i + max_parallel] 
-                try:
-                    batch_responses = self.generate_text(batch_prompts, timeout)
-                except Exception as e:
-                    print(f"[ERROR] Batch generation failed: {e}")
-                    new_failed_prompts.extend(batch_prompts) 
-                    continue
+        batch_start = time.time()
+        print(f"[INFO] Generating {n_items} items in {len(groups)} requests with up to {max_parallel} requests in flight")
 
-                for prompt, response in zip(batch_prompts, batch_responses):
-                    if response is None:
-                        print(f"[WARNING] Missing response. Retrying...")
-                        new_failed_prompts.append(prompt)
-                        continue
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            in_flight = {}
+
+            def submit(indices: List[int], current_prompt: str, attempt: int, delay: float = 0.0):
+                # Identical prompts for different groups are cached as separate samples
+                future = executor.submit(self._generate_text_cached, current_prompt, timeout, indices[0], response_schema, timings, delay)
+                in_flight[future] = (indices, current_prompt, attempt)
+
+            for indices in groups:
+                submit(indices, build_prompt(indices), 1)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices, current_prompt, attempt = in_flight.pop(future)
+                    retry_indices, retry_prompt = indices, None
+                    retry_delay = 0.0
 
                     try:
-                        data = json.loads(response)
-                        jsonschema.validate(instance=data, schema=json_schema)
-                        valid_responses.append(data["household"])  # Extract and extend
-                    except (json.JSONDecodeError, jsonschema.ValidationError) as e:
-                        print(e)
-                        print(response)
-                        print(f"[ERROR] Response validation failed. Retrying...")
-                        new_failed_prompts.append(self._build_correction_prompt(prompt, response, f"Validation error: {e}", json_schema))
+                        response, from_cache = future.result()
+                        if response is None:
+                            raise ValueError("Missing response")
+                    except Exception as e:
+                        print(f"[ERROR] Generation failed: {e}")
+                        retry_prompt = current_prompt
+                        retry_delay = self._backoff(attempt)
+                    else:
+                        try:
+                            with span(timings, JSON_PARSE):
+                                data = parse_json(response)
+                                items = data if isinstance(data, list) else data[items_key]
+                                if not isinstance(items, list):
+                                    raise ValueError(f'"{items_key}" is not an array')
+                        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                            print(response)
+                            print(f"[ERROR] Response could not be parsed. Retrying...")
+                            retry_prompt = self._build_correction_prompt(build_prompt(indices), response, f"JSON parse error: {e}", response_schema)
+                        else:
+                            retry_indices = []
+                            with span(timings, SCHEMA_VALIDATION):
+                                for index, item in zip(indices, items + [None] * (len(indices) - len(items))):
+                                    try:
+                                        item_validator.validate(item)
+                                        results[index] = item
+                                    except jsonschema.ValidationError as e:
+                                        print(f"[ERROR] Item {index + 1} failed validation: {e.message}")
+                                        retry_indices.append(index)
+                            if not retry_indices and not from_cache:
+                                self._cache_response(current_prompt, response, indices[0], response_schema)
+                            if retry_indices:
+                                retry_prompt = build_prompt(retry_indices)
+
+                    if retry_prompt is not None:
+                        if attempt < n_attempts:
+                            count(timings, RETRY)
+                            print(f"[INFO] Regenerating {len(retry_indices)} of {len(indices)} items (attempt {attempt + 1} of {n_attempts})")
+                            submit(retry_indices, retry_prompt, attempt + 1, retry_delay)
+                        else:
+                            print(f"[WARNING] Giving up on {len(retry_indices)} items after {n_attempts} attempts.")
+
+        batch_end = time.time()
+        print(f"[INFO] Batch completed in {batch_end - batch_start:.2f} seconds.\n\n")
+
+        return [result for result in results if result is not None]
+
+    def _cache_key(self, prompt: str, sample: int = 0, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        return ResponseCache.make_key(
+            type(self).__name__,
+            self.model_name,
+            getattr(self, "temperature", None),
+            getattr(self, "top_p", None),
+            getattr(self, "top_k", None),
+            prompt,
+            sample,
+            json_schema if self.supports_json_schema else None,
+        )
+
+    def _generate_text_cached(self, prompt: str, timeout: int, sample: int = 0, json_schema: Optional[Dict[str, Any]] = None, timings: Optional[Timings] = None, delay: float = 0.0) -> tuple[str, bool]:
+        """
+        Returns the cached response for a prompt if there is one, otherwise calls generate_text,
+        constraining the output to `json_schema` when the provider supports it. The tokens the
+        provider reports for the request are added to its llm_request timings.
+        A positive `delay` (the backoff before a retry) is waited before a request is sent.
+        """
+        if self.response_cache is not None:
+            cached = self.response_cache.get(self._cache_key(prompt, sample, json_schema))
+            if cached is not None:
+                count(timings, CACHE_HIT)
+                return cached, True
+        if delay > 0:
+            time.sleep(delay)
+
+        limiter = self.rate_limiter
+        reserved_tokens = 0
+        if limiter is not None:
+            reserved_tokens = limiter.estimate_tokens(prompt)
+            limiter.acquire(reserved_tokens)
+
+        BaseLLM._usage.tokens = None
+        try:
+            with self.request_budget or nullcontext(), span(timings, LLM_REQUEST):
+                if self.supports_json_schema and json_schema is not None:
+                    response = self.generate_text(prompt, timeout, json_schema=json_schema)
+                else:
+                    response = self.generate_text(prompt, timeout)
+        except Exception as e:
+            throttled, retry_after = throttle_signal(e)
+            if limiter is not None:
+                if throttled:
+                    limiter.on_throttled(retry_after)
+                else:
+                    limiter.release(reserved_tokens)
+            raise
+        finally:
+            usage = BaseLLM._usage.tokens
+            if usage is not None:
+                add_tokens(timings, LLM_REQUEST, *usage)
 
-            failed_prompts = new_failed_prompts
-            batch_end = time.time()
-            print(f"[INFO] Batch completed in {batch_end - batch_start:.2f} seconds.\n\n")
+        if limiter is not None:
+            prompt_tokens, completion_tokens = (usage[0], usage[1]) if usage is not None else (None, None)
+            limiter.on_success(reserved_tokens, prompt_tokens, completion_tokens)
+        return response, False
 
-        return valid_responses
+    def _backoff(self, attempt: int) -> float:
+        """Seconds to wait before resending a request that failed on attempt `attempt`, with full jitter."""
+        return jitter.uniform(0, min(self.max_backoff, self.retry_backoff * 2 ** (attempt - 1)))
 
+    def _cache_response(self, prompt: str, response: str, sample: int = 0, json_schema: Optional[Dict[str, Any]] = None):
+        """Stores a validated response so identical requests can be replayed without an LLM call."""
+        if self.response_cache is not None:
+            self.response_cache.put(self._cache_key(prompt, sample, json_schema), response)
 
     def _build_correction_prompt(
         self,
@@ -0,0 +1,170 @@
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.llm_interface.base_llm import BaseLLM
+from src.services.file_service import FileService
+
+# "Household 3: 4 people" lines of a multi-household prompt, and "exactly 4 people" in a single one
+_REQUIREMENT_LINE = re.compile(r"^Household \d+: (.*)$", flags=re.MULTILINE)
+_SIZE = re.compile(r"\b(\d+) (?:person|people)\b")
+_EXACT_SIZE = re.compile(r"\bexactly (\d+) (?:person|people)\b")
+
+
+class FakeLLM(BaseLLM):
+    """
+    Offline stand-in for an LLM provider, for benchmarking and profiling the pipeline without
+    network access or API costs. Responses are random instances of the requested JSON Schema,
+    shaped like households (the first member is the Head, household_size matches the members,
+    and requested sizes and household counts are read from the prompt).
+
+    - latency / latency_sigma: each call sleeps for a log-normal time with this median (seconds)
+      and shape; a sigma of 0 gives a constant latency
+    - failure_rate: fraction of calls that raise, as a dropped connection would
+    - malformed_rate: fraction of responses that are truncated, so they cannot be parsed or repaired
+
+    Token usage is reported as an estimate of four characters per token.
+
+    Responses are seeded by the prompt and how many times it has been requested, so a run is
+    reproducible for a given seed regardless of how the requests are interleaved across threads.
+    """
+
+    is_local = True
+    supports_json_schema = True
+
+    def __init__(
+        self,
+        model_name: str = "fake",
+        seed: int = 0,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        temperature: float = 0.0,
+        **kwargs
+    ):
+        self.model_name = model_name
+        self.seed = seed
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.temperature = temperature
+        self.kwargs = kwargs
+        self._calls: Dict[str, int] = {}
+        self._calls_lock = threading.Lock()
+        self._default_schema = None
+
+    def get_model_metadata(self) -> str:
+        return (
+            f'FakeLLM("{self.model_name}", seed={self.seed}, latency={self.latency}, latency_sigma={self.latency_sigma}, '
+            f'failure_rate={self.failure_rate}, malformed_rate={self.malformed_rate})'
+        )
+
+    def generate_text(self, prompt: str | list[str], timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str | list[str]:
+        if isinstance(prompt, list):
+            return [self._call_fake(p, timeout, json_schema) for p in prompt]
+        return self._call_fake(prompt, timeout, json_schema)
+
+    def _call_fake(self, prompt: str, timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        with self._calls_lock:
+            call = self._calls.get(prompt, 0)
+            self._calls[prompt] = call + 1
+        rng = random.Random(f"{self.seed}:{call}:{prompt}")
+
+        delay = self.latency * rng.lognormvariate(0, self.latency_sigma) if self.latency > 0 else 0.0
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"LLM call timed out after {timeout} seconds.")
+        time.sleep(delay)
+
+        if rng.random() < self.failure_rate:
+            raise ConnectionError("Simulated provider failure")
+
+        if json_schema is None:
+            json_schema = self._load_default_schema()
+        response = json.dumps(self._response(json_schema, prompt, rng))
+        if rng.random() < self.malformed_rate:
+            response = response[:rng.randrange(1, max(2, len(response) - 1))]
+        self.record_usage(_estimate_tokens(prompt), _estimate_tokens(response))
+        return response
+
+    def _load_default_schema(self) -> Dict[str, Any]:
+        if self._default_schema is None:
+            self._default_schema = FileService().load_schema("household_schema.json")
+        return self._default_schema
+
+    def _response(self, schema: Dict[str, Any], prompt: str, rng: random.Random) -> Any:
+        requirements = _REQUIREMENT_LINE.findall(prompt)
+        properties = schema.get("properties", {})
+
+        # A multi-household request: one household per requirement line
+        if requirements and len(properties) == 1:
+            key, array_schema = next(iter(properties.items()))
+            if array_schema.get("type") == "array":
+                return {key: [self._household(array_schema["items"], _requested_size(line, _SIZE), rng) for line in requirements]}
+
+        if "household" in properties:
+            return self._household(schema, _requested_size(prompt, _EXACT_SIZE), rng)
+        return _instance(schema, rng)
+
+    def _household(self, schema: Dict[str, Any], size: Optional[int], rng: random.Random) -> Dict[str, Any]:
+        members_schema = schema["properties"]["household"]
+        if size is not None:
+            members_schema = {**members_schema, "minItems": size, "maxItems": size}
+        household = _instance({**schema, "properties": {**schema["properties"], "household": members_schema}}, rng)
+
+        members = household["household"]
+        relationships = members_schema.get("items", {}).get("properties", {}).get("relationship_to_head", {}).get("enum", [])
+        if "Head" in relationships:
+            for member in members:
+                if member.get("relationship_to_head") == "Head":
+                    member["relationship_to_head"] = rng.choice([r for r in relationships if r != "Head"])
+            members[0]["relationship_to_head"] = "Head"
+            if isinstance(members[0].get("age"), int):
+                members[0]["age"] = max(members[0]["age"], 18)
+        if "household_size" in household:
+            household["household_size"] = len(members)
+        return household
+
+
+def _estimate_tokens(text: str) -> int:
+    """Roughly four characters per token, as for English text with common tokenizers."""
+    return max(1, len(text) // 4)
+
+
+def _requested_size(text: str, pattern: re.Pattern) -> Optional[int]:
+    match = pattern.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _instance(schema: Dict[str, Any], rng: random.Random) -> Any:
+    """Draws a random value satisfying the subset of JSON Schema used by the household schemas."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = rng.choice(schema_type)
+
+    if schema_type == "object":
+        return {name: _instance(value, rng) for name, value in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        min_items = schema.get("minItems", 0)
+        n_items = rng.randint(min_items, schema.get("maxItems", max(min_items, 1) + 4))
+        return [_instance(schema.get("items", {}), rng) for _ in range(n_items)]
+    if schema_type == "integer":
+        minimum = schema.get("minimum", 0)
+        return rng.randint(minimum, schema.get("maximum", minimum + 100))
+    if schema_type == "number":
+        minimum = schema.get("minimum", 0)
+        return round(rng.uniform(minimum, schema.get("maximum", minimum + 100)), 2)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema_type == "null":
+        return None
+
+    length = max(schema.get("minLength", 1), 1)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(max(length, 8)))
@@ -20,4 +20,7 @@ class GeminiModel(BaseLLM):
 
     def _call_gemini(self, prompt: str, timeout=30) -> str:
         response = self.model.generate_content(prompt, generation_config={"temperature": self.temperature})
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.record_usage(usage.prompt_token_count, usage.candidates_token_count, getattr(usage, "cached_content_token_count", 0))
         return response.text.strip()
@@ -4,6 +4,7 @@ from src.llm_interface.base_llm import BaseLLM
 from src.llm_interface.ollama_model import OllamaModel
 from src.llm_interface.openai_model import OpenAIModel
 from src.llm_interface.gemini_model import GeminiModel
+from src.llm_interface.fake_model import FakeLLM
 
 class LLMFactory:
     @staticmethod
@@ -22,5 +23,7 @@ class LLMFactory:
             if not api_key:
                 raise EnvironmentError("Missing GEMINI_API_KEY in secrets.env")
             return GeminiModel(**kwargs)
+        elif model_type == "fake":
+            return FakeLLM(**kwargs)
         else:
             raise ValueError(f"Unknown model type: {model_type}")
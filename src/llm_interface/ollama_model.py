@@ -1,62 +1,64 @@
 import subprocess
+import threading
+from typing import Any, Dict, Optional
+import httpx
+from ollama import Client
 from src.llm_interface.base_llm import BaseLLM
-from langchain_ollama import OllamaLLM
-import multiprocessing
 
 class OllamaModel(BaseLLM):
     is_local = True
+    supports_json_schema = True
 
-    def __init__(self, model_name: str, temperature: float = 0.7, top_p: float = 0.95, top_k: int = 40, format: str = "json", **kwargs):
+    def __init__(self, model_name: str, temperature: float = 0.7, top_p: float = 0.95, top_k: int = 40, format: str = "json", host: str = None, **kwargs):
         self.model_name = model_name
         self.temperature = temperature
         self.top_p = top_p
         self.top_k = top_k
         self.format = format
+        self.host = host
         self.kwargs = kwargs
-        self.llm = self._load_model()
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self.options = self._load_model()
     
     def get_model_metadata(self):
         return f'OllamaModel("{self.model_name}", temperature={self.temperature}, top_p={self.top_p}, top_k={self.top_k})'
 
-    def generate_text(self, prompt: str | list[str], timeout=30) -> str | list[str]:
-        def call_llm(queue):
-            """Function to execute the LLM request inside a separate process."""
-            try:
-                if isinstance(prompt, str):
-                    result = self.llm.invoke(prompt)
-                else:
-                    result = self.llm.batch(prompt)
-                queue.put(result)  # Send result to main process
-            except Exception as e:
-                queue.put(e)  # Send error to main process
+    def generate_text(self, prompt: str | list[str], timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str | list[str]:
+        if isinstance(prompt, list):
+            return [self._call_ollama(p, timeout, json_schema) for p in prompt]
+        return self._call_ollama(prompt, timeout, json_schema)
 
-        queue = multiprocessing.Queue()
-        process = multiprocessing.Process(target=call_llm, args=(queue,))
-        process.start()
-        process.join(timeout)
-
-        if process.is_alive():
-            print("[TIMEOUT] LLM call exceeded time limit. Terminating process...")
-            process.terminate() 
-            process.join()  
-            raise TimeoutError(f"LLM batch call timed out after {timeout} seconds.")
+    def _call_ollama(self, prompt: str, timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        try:
+            response = self._get_client(timeout).generate(
+                model=self.model_name,
+                prompt=prompt,
+                # A schema makes Ollama constrain decoding to it; otherwise any JSON is accepted
+                format=json_schema if json_schema is not None else self.format,
+                options=self.options,
+                stream=False
+            )
+        except httpx.TimeoutException as e:
+            print("[TIMEOUT] LLM call exceeded time limit. Request cancelled.")
+            raise TimeoutError(f"LLM call timed out after {timeout} seconds.") from e
+        self.record_usage(response.get("prompt_eval_count"), response.get("eval_count"))
+        return response["response"]
 
-        if not queue.empty():
-            response = queue.get()
-            if isinstance(response, Exception):
-                raise response 
-            return response
+    def _get_client(self, timeout) -> Client:
+        """Returns a persistent HTTP client for the given timeout, reusing its pooled connections."""
+        with self._clients_lock:
+            if timeout not in self._clients:
+                self._clients[timeout] = Client(host=self.host, timeout=timeout)
+            return self._clients[timeout]
 
-        raise TimeoutError("LLM call did not return a response.")
-    
     def _load_model(self):
         available_models = self._get_available_models()
         if self.model_name not in available_models:
             print(f"[WARN] Model '{self.model_name}' is not installed. Attempting to pull...")
             if not self._pull_model():
                 print(f"[ERROR] Could not pull model '{self.model_name}'.")
-        return OllamaLLM(model=self.model_name, temperature=self.temperature, top_p=self.top_p, top_k=self.top_k, format=self.format, num_ctx=4096, num_predict=2048, num_thread=12, **self.kwargs)
-            
+        return {"temperature": self.temperature, "top_p": self.top_p, "top_k": self.top_k, "num_ctx": 4096, "num_predict": 2048, "num_thread": 12, **self.kwargs}
 
     def _pull_model(self) -> bool:
         cmd_list = ["ollama", "pull", self.model_name]
@@ -1,8 +1,13 @@
+from typing import Any, Dict, Optional
 from openai import AzureOpenAI
 from src.llm_interface.base_llm import BaseLLM
 
+# Keywords strict structured outputs do not accept; responses are still validated against the full schema
+UNSUPPORTED_STRICT_KEYWORDS = {"$schema", "minimum", "maximum", "minItems", "maxItems", "minLength", "maxLength", "pattern", "format"}
+
 class OpenAIModel(BaseLLM):
     is_local = False
+    supports_json_schema = True
 
     def __init__(self, model_name: str = "gpt-4o", api_key: str = None, temperature: float = 0.7, top_p: float = 0.95, top_k: int = 40, **kwargs):
         self.model_name = model_name
@@ -15,20 +20,61 @@ class OpenAIModel(BaseLLM):
         self.top_p = top_p
         self.top_k = top_k
         self.kwargs = kwargs
+        self._response_formats = {}
 
     def get_model_metadata(self) -> str:
         return f'OpenAIModel("{self.model_name}")'
 
-    def generate_text(self, prompt: str | list[str], timeout=30) -> str | list[str]:
+    def generate_text(self, prompt: str | list[str], timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str | list[str]:
         if isinstance(prompt, list):
-            return [self._call_openai(p, timeout) for p in prompt]
-        return self._call_openai(prompt, timeout)
+            return [self._call_openai(p, timeout, json_schema) for p in prompt]
+        return self._call_openai(prompt, timeout, json_schema)
 
-    def _call_openai(self, prompt: str, timeout=30) -> str:
+    def _call_openai(self, prompt: str, timeout=30, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        extra = {"response_format": self._response_format(json_schema)} if json_schema is not None else {}
         response = self.client.chat.completions.create(
             model=self.model_name,
             messages=[{"role": "user", "content": prompt}],
             #temperature=self.temperature,
-            timeout=timeout
+            timeout=timeout,
+            **extra
         )
+        if response.usage is not None:
+            details = response.usage.prompt_tokens_details
+            self.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens, details.cached_tokens if details else 0)
         return response.choices[0].message.content.strip()
+
+    def _response_format(self, json_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Builds (once per schema) the strict json_schema response format for a JSON Schema."""
+        entry = self._response_formats.get(id(json_schema))
+        if entry is None or entry[0] is not json_schema:
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": json_schema.get("title", "response"),
+                    "schema": _strict_schema(json_schema),
+                    "strict": True,
+                },
+            }
+            entry = self._response_formats[id(json_schema)] = (json_schema, response_format)
+        return entry[1]
+
+
+def _strict_schema(schema: Any) -> Any:
+    """
+    Converts a JSON Schema to the subset strict structured outputs accept: every object lists
+    all of its properties as required and forbids additional ones, and unsupported keywords are dropped.
+    """
+    if isinstance(schema, list):
+        return [_strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    strict = {key: _strict_schema(value) for key, value in schema.items() if key not in UNSUPPORTED_STRICT_KEYWORDS}
+    if "properties" in schema:
+        # "properties" maps names to schemas, so its keys must not be filtered as keywords
+        strict["properties"] = {name: _strict_schema(value) for name, value in schema["properties"].items()}
+    if strict.get("type") == "object":
+        strict["required"] = list(strict.get("properties", {}))
+        strict["additionalProperties"] = False
+    return strict
@@ -0,0 +1,24 @@
+from typing import Dict, Optional, Tuple
+
+# USD per million tokens as (prompt, cached prompt, completion), by model name.
+# Update these when provider prices change; models that are missing have no cost estimate.
+PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "DeepSeek-R1-0528": (1.35, 1.35, 5.40),
+    "gemini-pro": (0.50, 0.50, 1.50),
+}
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> Optional[float]:
+    """
+    The cost in USD of the given token usage, or None when the model has no listed price.
+    Cached tokens are part of the prompt tokens and are charged at the cached rate.
+    """
+    if model_name not in PRICES:
+        return None
+    prompt_price, cached_price, completion_price = PRICES[model_name]
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * prompt_price + cached_tokens * cached_price + completion_tokens * completion_price) / 1_000_000
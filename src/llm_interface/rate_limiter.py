@@ -0,0 +1,225 @@
+import email.utils
+import random
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+# Jitter for retry and rate-limit waits, so clients that back off together do not retry in lockstep
+jitter = random.Random()
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    requests REAL,
+    tokens REAL,
+    updated REAL,
+    scale REAL,
+    blocked_until REAL,
+    completion_estimate REAL
+);
+"""
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter for one provider endpoint, covering requests per minute and
+    tokens per minute (either can be None). The buckets live in a small SQLite file, so every
+    thread and process of a run that uses the same `key` and `state_path` draws from them.
+
+    The configured rates are scaled by an AIMD factor: each throttling response (HTTP 429) or
+    timeout halves it, down to `min_scale`, and each successful request adds `increase_step`
+    back, up to 1. A Retry-After on a 429 blocks the endpoint for every caller until it passes.
+    Buckets hold at most `burst_seconds` worth of their rate, so callers that were waiting
+    do not all start at once.
+
+    A request's tokens are estimated before it is sent (about four characters per prompt token,
+    plus the average completion so far) and corrected with the usage the provider reports.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        state_path: str = "data/rate_limits.sqlite",
+        burst_seconds: float = 10.0,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.01,
+        min_scale: float = 0.05,
+        idle_reset_seconds: float = 300.0
+    ):
+        self.key = key
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.state_path = state_path
+        self.burst_seconds = burst_seconds
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_scale = min_scale
+        self.idle_reset_seconds = idle_reset_seconds
+        self._local = threading.local()
+
+    def estimate_tokens(self, prompt: str) -> int:
+        """Tokens to reserve for a request: the estimated prompt plus the average completion so far."""
+        return max(1, len(prompt) // 4) + int(self._read("completion_estimate") or 0)
+
+    def acquire(self, tokens: int = 0):
+        """Blocks until the buckets allow a request of `tokens` tokens, then takes them."""
+        while True:
+            wait = self._transaction(lambda state, now: self._take(state, now, tokens))
+            if wait <= 0:
+                return
+            # A little jitter keeps waiting callers from retrying in lockstep
+            time.sleep(wait + jitter.uniform(0, 0.05 * wait + 0.01))
+
+    def on_success(self, reserved_tokens: int = 0, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        """Grows the rate additively and settles the tokens reserved for the request against its reported usage."""
+        def update(state, now):
+            state["scale"] = min(1.0, state["scale"] + self.increase_step)
+            if prompt_tokens is not None and completion_tokens is not None:
+                state["tokens"] -= prompt_tokens + completion_tokens - reserved_tokens
+                previous = state["completion_estimate"]
+                state["completion_estimate"] = completion_tokens if previous is None else 0.8 * previous + 0.2 * completion_tokens
+            return 0.0
+        self._transaction(update)
+
+    def release(self, reserved_tokens: int = 0):
+        """Returns the tokens reserved for a request that failed without reaching the provider's limits."""
+        def update(state, now):
+            if self.tokens_per_minute:
+                state["tokens"] = min(self._capacity(self._rates(state)[1]), state["tokens"] + reserved_tokens)
+            return 0.0
+        self._transaction(update)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Cuts the rate multiplicatively after a 429 or timeout, blocking everyone for `retry_after` seconds if given."""
+        def update(state, now):
+            state["scale"] = max(self.min_scale, state["scale"] * self.decrease_factor)
+            state["requests"] = min(state["requests"], 0.0)
+            if retry_after:
+                state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+            return 0.0
+        self._transaction(update)
+
+    def _take(self, state: dict, now: float, tokens: int) -> float:
+        """Takes a request and its tokens if both buckets allow it; otherwise returns how long to wait."""
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+
+        waits = [0.0]
+        request_rate, token_rate = self._rates(state)
+        if request_rate and state["requests"] < 1:
+            waits.append((1 - state["requests"]) / request_rate)
+        if token_rate:
+            # Requests larger than the bucket may start once it is full, leaving it in debt
+            needed = min(tokens, self._capacity(token_rate))
+            if state["tokens"] < needed:
+                waits.append((needed - state["tokens"]) / token_rate)
+
+        wait = max(waits)
+        if wait <= 0:
+            state["requests"] -= 1
+            state["tokens"] -= tokens
+        return wait
+
+    def _rates(self, state: dict) -> Tuple[Optional[float], Optional[float]]:
+        """The current requests and tokens per second, after AIMD scaling."""
+        request_rate = self.requests_per_minute * state["scale"] / 60 if self.requests_per_minute else None
+        token_rate = self.tokens_per_minute * state["scale"] / 60 if self.tokens_per_minute else None
+        return request_rate, token_rate
+
+    def _capacity(self, rate: float) -> float:
+        return max(1.0, rate * self.burst_seconds)
+
+    def _refill(self, state: dict, now: float):
+        elapsed = max(0.0, now - state["updated"])
+        request_rate, token_rate = self._rates(state)
+        if request_rate:
+            state["requests"] = min(self._capacity(request_rate), state["requests"] + elapsed * request_rate)
+        if token_rate:
+            state["tokens"] = min(self._capacity(token_rate), state["tokens"] + elapsed * token_rate)
+        state["updated"] = now
+
+    def _fresh_state(self, now: float) -> dict:
+        return {
+            "requests": self._capacity(self.requests_per_minute / 60) if self.requests_per_minute else 0.0,
+            "tokens": self._capacity(self.tokens_per_minute / 60) if self.tokens_per_minute else 0.0,
+            "updated": now,
+            "scale": 1.0,
+            "blocked_until": 0.0,
+            "completion_estimate": None,
+        }
+
+    def _transaction(self, update) -> float:
+        """Runs `update(state, now)` on the refilled state of this key under an exclusive lock and saves it."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT requests, tokens, updated, scale, blocked_until, completion_estimate FROM rate_limits WHERE key = ?",
+                (self.key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.idle_reset_seconds:
+                # State left over from an earlier run says nothing about the provider now
+                state = self._fresh_state(now)
+                if row is not None:
+                    state["completion_estimate"] = row[5]
+            else:
+                state = dict(zip(("requests", "tokens", "updated", "scale", "blocked_until", "completion_estimate"), row))
+                self._refill(state, now)
+
+            result = update(state, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, requests, tokens, updated, scale, blocked_until, completion_estimate) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key, state["requests"], state["tokens"], state["updated"], state["scale"], state["blocked_until"], state["completion_estimate"])
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _read(self, column: str):
+        row = self._connect().execute(f"SELECT {column} FROM rate_limits WHERE key = ?", (self.key,)).fetchone()
+        return row[0] if row else None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.executescript(STATE_SCHEMA)
+        return conn
+
+
+def throttle_signal(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Whether a failed request indicates the provider is overloaded (a 429 or a timeout), and the
+    Retry-After it asked for in seconds, if any. Works across the provider SDKs by duck typing.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429 or type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True, _retry_after(error)
+    if isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+        return True, None
+    return False, None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # Retry-After may also be an HTTP date
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
@@ -0,0 +1,24 @@
+import threading
+from typing import Optional
+
+
+class RequestBudget:
+    """
+    Caps the requests in flight to one provider across every model instance and thread that
+    shares it at `max_concurrent` (None for no limit). Request rates are left to RateLimiter.
+    Used as a context manager around each request.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def __enter__(self):
+        if self._slots is not None:
+            self._slots.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._slots is not None:
+            self._slots.release()
+        return False
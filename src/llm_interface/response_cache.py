@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """
+    A content-addressed on-disk cache of raw LLM responses, stored in SQLite.
+    Entries are keyed by a hash of the provider, model parameters and prompt,
+    and the least recently used entries are evicted once the size cap is exceeded.
+
+    Modes:
+    - "read_write": serve hits and store new responses
+    - "read_only": serve hits but never store
+    - "bypass": neither read nor write
+    """
+
+    MODES = ("read_write", "read_only", "bypass")
+
+    def __init__(self, path: str = "data/llm_cache.sqlite", max_size_mb: float = 512, mode: str = "read_write"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT,
+                size INTEGER,
+                last_access REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+        """)
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(provider: str, model_name: str, temperature: Any, top_p: Any, top_k: Any, prompt: str, sample: int = 0, json_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Hashes the request parameters into a cache key. `sample` distinguishes repeated
+        requests for the same prompt, so a batch of identical prompts keeps distinct responses.
+        `json_schema` is the schema the output was constrained to, if any.
+        """
+        params = [provider, model_name, temperature, top_p, top_k, prompt, sample]
+        if json_schema is not None:
+            params.append(json_schema)
+        payload = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.mode == "bypass":
+            return None
+
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if self.mode == "read_write":
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        if self.mode != "read_write" or response is None:
+            return
+
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            existing = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if existing is not None:
+                self._total_size -= existing[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            self._total_size += size
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Deletes the least recently used entries until the cache fits within its size cap."""
+        while self._total_size > self.max_size_bytes:
+            oldest = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 100").fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if self._total_size <= self.max_size_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_size -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters for this cache instance."""
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_size = 0
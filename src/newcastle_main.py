@@ -1,157 +1,4 @@
-import os
-from dotenv import load_dotenv
-from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
-from src.classifiers.household_size.dar_es_salaam import DarEsSalaamHouseholdSizeClassifier
-from src.classifiers.household_size.un_global import UNHouseholdSizeClassifier
-from src.classifiers.household_type.un_global import UNHouseholdCompositionClassifier
-from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
-from llm_interface.azure_model import AzureModel
-from llm_interface.openai_model import OpenAIModel
-from src.services.experiment_run_service import ExperimentRunService
-from src.services.experiments_service import ExperimentService
-from src.services.metadata_service import MetadataService
-from src.services.report_service import ReportService
-from src.services.population_service import PopulationService
-from src.services.file_service import FileService
-from src.repositories.metadata_repository import MetadataRepository
-from src.repositories.population_repository import PopulationRepository
-from src.llm_interface.ollama_model import OllamaModel
-import time
-import pandas as pd
-import uuid
+from src.run_experiments import run_spec_file
 
-file_service = FileService()
-population_service = PopulationService()
-report_service = ReportService()
-metadata_service = MetadataService()
-experiments_service = ExperimentService()
-experiment_run_service = ExperimentRunService()
-
-load_dotenv("secrets.env")
-
-model = OpenAIModel(
-    model_name="gpt-4o",
-    api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.7,
-    top_p=0.85,
-    top_k=100
-)
-
-hh_type_classifier = UKHouseholdCompositionClassifier()
-hh_size_classifier = UKHouseholdSizeClassifier()
-location = "Newcastle, UK"
-region = "E12000001"
-n_households = 2500
-batch_size = 10
-include_stats = True
-include_target = True
-include_guidance = False
-compute_household_size = False
-use_microdata = False
-no_occupation = True
-no_household_composition = False
-include_avg_household_size = False
-custom_guidance = None
-schema = file_service.load_schema("household_schema_no_occupation_old.json")
-prompt_files = [f"prompt_generation/gpt-4o-1.txt"]
-
-for prompt_file in prompt_files:
-    n_runs = 1
-    experiment_id = str(uuid.uuid4())
-    experiment_start_time = time.time()
-    prompt = file_service.load_prompt(
-        prompt_file, {"LOCATION": location, "TOTAL_HOUSEHOLDS": str(n_households)}
-    )
-
-    for run in range(n_runs):
-        population_id = str(uuid.uuid4())
-
-        start_time = time.time()
-
-        try:
-            households = population_service.generate_households(
-                n_households,
-                model,
-                prompt,
-                schema,
-                location,
-                region,
-                batch_size,
-                include_stats,
-                include_guidance,
-                use_microdata,
-                compute_household_size,
-                include_target,
-                no_occupation,
-                run+1,
-                no_household_composition,
-                include_avg_household_size,
-                custom_guidance,
-                hh_type_classifier,
-                hh_size_classifier
-            )
-            execution_time = time.time() - start_time
-
-            flat_data = [person for household in households for person in household]
-            df = pd.DataFrame(flat_data)
-            report_filename = report_service.generate_report(population_id, df)
-
-            metadata = {
-                "population_id": population_id,
-                "location": location,
-                "model": model.model_name,
-                "temperature": model.temperature,
-                "top_p": model.top_p,
-                "top_k": model.top_k,
-                "num_households": len(households),
-                "execution_time": execution_time,
-                "prompt": prompt,
-                "include_stats": include_stats,
-                "include_guidance": include_guidance,
-                "include_target": include_target,
-                "use_microdata": use_microdata,
-                "compute_household_size": compute_household_size,
-                "no_occupation": no_occupation,
-                "no_household_composition": no_household_composition,
-                "include_avg_household_size": include_avg_household_size,
-                "hh_type_classifier": hh_type_classifier.get_name(),
-                "hh_size_classifier": hh_size_classifier.get_name()
-            }
-
-            run = {
-                "experiment_id": experiment_id,
-                "run_number": run,
-                "population_id": population_id,
-                "execution_time": execution_time,
-            }
-
-            metadata_service.save_metadata(metadata)
-            population_service.save_population(population_id, households)
-            experiment_run_service.save_run(run)
-
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-    experiment_execution_time = experiment_start_time - time.time()
-    experiment = {
-        "experiment_id": experiment_id,
-        "location": location,
-        "model": model.model_name,
-        "temperature": model.temperature,
-        "top_p": model.top_p,
-        "top_k": model.top_k,
-        "execution_time": experiment_execution_time,
-        "prompt": prompt,
-        "include_stats": include_stats,
-        "include_guidance": include_guidance,
-        "include_target": include_target,
-        "use_microdata": use_microdata,
-        "compute_household_size": compute_household_size,
-        "no_occupation": no_occupation,
-        "no_household_composition": no_household_composition,
-        "include_avg_household_size": include_avg_household_size,
-        "hh_type_classifier": hh_type_classifier.get_name(),
-        "hh_size_classifier": hh_size_classifier.get_name()
-    }
-
-    experiments_service.save_experiment(experiment)
\ No newline at end of file
+# Settings live in the spec; edit it, or run another spec with python -m src.run_experiments
+run_spec_file("experiments/newcastle_prompts.toml")
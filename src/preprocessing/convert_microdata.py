@@ -0,0 +1,52 @@
+"""
+One-time conversion of the UK microdata extract into a columnar store partitioned by region.
+
+Each region is written to its own uncompressed Arrow IPC (Feather v2) file,
+data/microdata/household_uk/region=<code>/part-0.arrow. Only the columns used by
+convert_microdata_row and the sampler are kept. FileService.load_microdata memory-maps
+the requested region's file and converts it to a DataFrame once per process, instead of
+parsing the whole tab-separated extract.
+
+Usage:
+    python -m src.preprocessing.convert_microdata [--source data/microdata/household_uk.tab] [--output data/microdata/household_uk]
+"""
+import argparse
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.services.file_service import FileService
+from src.utils.microdata_decoder import MICRODATA_COLUMNS
+
+
+def convert_microdata(source: str, output_dir: str):
+    df = pd.read_csv(source, sep="\t", usecols=["region", *MICRODATA_COLUMNS])
+    # Keep the row labels of the extract, so sampled rows (e.g. in checkpoints) refer to the same records
+    df.insert(0, "row_id", df.index)
+
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    for region, partition in df.groupby("region", sort=True):
+        partition_dir = os.path.join(tmp_dir, f"region={region}")
+        os.makedirs(partition_dir)
+        table = pa.Table.from_pandas(partition.drop(columns="region"), preserve_index=False)
+        feather.write_feather(table, os.path.join(partition_dir, "part-0.arrow"), compression="uncompressed")
+        print(f"✅ {region}: {len(partition)} rows")
+
+    # Replace the previous store only once every partition has been written
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the microdata extract into a region-partitioned Arrow store.")
+    parser.add_argument("--source", default=FileService.MICRODATA)
+    parser.add_argument("--output", default=FileService.MICRODATA_STORE)
+    args = parser.parse_args()
+    convert_microdata(args.source, os.path.normpath(args.output))
+
+
+if __name__ == "__main__":
+    main()
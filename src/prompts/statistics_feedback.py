@@ -7,6 +7,7 @@ from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
 from src.classifiers.household_type.base import HouseholdCompositionClassifier
 from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
 from src.services.file_service import FileService
+from src.analysis.population_stats import PopulationStatsAccumulator
 from src.analysis.distributions import (
     compute_age_distribution,
     compute_gender_distribution,
@@ -14,6 +15,8 @@ from src.analysis.distributions import (
     compute_target_age_distribution,
 )
 
+file_service = FileService()
+
 
 def generate_distribution_prompt(
     observed_distribution: dict,
@@ -189,10 +192,17 @@ def update_prompt_with_statistics(
     include_avg_household_size: bool = False,
     custom_guidance: Optional[str] = None,
     hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(),
-    hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier()
+    hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier(),
+    population_stats: Optional[PopulationStatsAccumulator] = None
 ) -> str:
-    """Updates the LLM prompt to incorporate feedback from previous batches."""
-    if synthetic_df is None:
+    """
+    Updates the LLM prompt to incorporate feedback from previous batches.
+    Observed statistics are read from `population_stats` when given, otherwise they are computed from `synthetic_df`.
+    """
+    if population_stats is not None and population_stats.n_households == 0:
+        population_stats = None
+
+    if synthetic_df is None and population_stats is None:
         prompt = (
             base_prompt.replace("{N_HOUSEHOLDS}", str(n_households_generated))
             .replace("{GUIDANCE}", "")
@@ -220,11 +230,24 @@ def update_prompt_with_statistics(
             include_target=include_target,
         )
     
-    fs = FileService()
+    if population_stats is not None:
+        observed_size = population_stats.household_size_distribution
+        observed_composition = population_stats.household_composition_distribution
+        observed_gender = population_stats.gender_distribution
+        observed_age = population_stats.age_distribution
+        observed_occupation = population_stats.occupation_distribution
+        observed_avg_household_size = population_stats.average_household_size
+    else:
+        observed_size = lambda: hh_size_classifier.compute_observed_distribution(synthetic_df)
+        observed_composition = lambda: hh_type_classifier.compute_observed_distribution(synthetic_df, "relationship_to_head")
+        observed_gender = lambda: compute_gender_distribution(synthetic_df)
+        observed_age = lambda: compute_age_distribution(synthetic_df)
+        observed_occupation = lambda: compute_occupation_distribution(synthetic_df)
+        observed_avg_household_size = lambda: hh_size_classifier.compute_average_household_size(synthetic_df)
 
     size_stats_text = build_dist(
-        lambda: hh_size_classifier.compute_observed_distribution(synthetic_df),
-        lambda: fs.load_household_size(location),
+        observed_size,
+        lambda: file_service.load_household_size(location),
         lambda size: f"{size}-person",
         "Household Size",
         0.5,
@@ -233,24 +256,24 @@ def update_prompt_with_statistics(
     composition_stats_text = ""
     if not no_household_composition:
         composition_stats_text = build_dist(
-            lambda: hh_type_classifier.compute_observed_distribution(synthetic_df, "relationship_to_head"),
-            lambda: fs.load_household_composition(location),
+            observed_composition,
+            lambda: file_service.load_household_composition(location),
             lambda composition: composition,
             "Household Composition",
             0.5,
         )
 
     gender_stats_text = build_dist(
-        lambda: compute_gender_distribution(synthetic_df),
-        lambda: fs.load_sex_distribution(location),
+        observed_gender,
+        lambda: file_service.load_sex_distribution(location),
         lambda gender: gender,
         "Gender",
         0.5,
     )
 
     age_stats_text = build_dist(
-        lambda: compute_age_distribution(synthetic_df),
-        lambda: compute_target_age_distribution(fs.load_age_pyramid(location)),
+        observed_age,
+        lambda: compute_target_age_distribution(file_service.load_age_pyramid(location)),
         lambda band: f"{band} years",
         "Age Group",
         1,
@@ -259,8 +282,8 @@ def update_prompt_with_statistics(
     occupation_stats_text = ""
     if not no_occupation:
         occupation_stats_text = build_dist(
-            lambda: compute_occupation_distribution(synthetic_df),
-            lambda: fs.load_occupation_distribution(location),
+            observed_occupation,
+            lambda: file_service.load_occupation_distribution(location),
             lambda occupation: f"category {occupation}",
             "Occupation",
             0.5,
@@ -269,8 +292,8 @@ def update_prompt_with_statistics(
     avg_household_size_text = ""
     if include_avg_household_size:
         avg_household_size_text = generate_scalar_prompt(
-            actual_value=hh_size_classifier.compute_average_household_size(synthetic_df),
-            target_value=fs.load_avg_household_size(location),
+            actual_value=observed_avg_household_size(),
+            target_value=file_service.load_avg_household_size(location),
             label="Average Household Size",
             guidance_label="Household Size",
             unit="persons",
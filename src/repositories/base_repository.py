@@ -1,6 +1,22 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from src.repositories.db_manager import DBManager
 
+
+def select_query(table: str, condition: Optional[str] = None, limit: Optional[int] = None) -> str:
+    """Builds the SELECT issued by fetch_one and fetch_all, so repositories can export their queries."""
+    query = f"SELECT * FROM {table}"
+    if condition:
+        query += f" WHERE {condition}"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return query
+
+
+def delete_query(table: str, condition: str) -> str:
+    return f"DELETE FROM {table} WHERE {condition}"
+
+
 class BaseRepository(ABC):
     """
     Abstract repository class providing common database operations.
@@ -24,6 +40,18 @@ class BaseRepository(ABC):
         query = f"INSERT INTO {self.table_name()} ({columns}) VALUES ({placeholders})"
         self.db_manager.execute_query(query, tuple(data.values()))
 
+    def insert_many(self, rows: list[dict]):
+        """
+        Inserts several records into the table in one transaction.
+        All rows must have the same keys as the first row.
+        """
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        placeholders = ", ".join(["?"] * len(columns))
+        query = f"INSERT INTO {self.table_name()} ({', '.join(columns)}) VALUES ({placeholders})"
+        self.db_manager.execute_many(query, [tuple(row[column] for column in columns) for row in rows])
+
     def update(self, data: dict, condition: str, params: tuple):
         """
         Updates a record in the table.
@@ -40,21 +68,16 @@ class BaseRepository(ABC):
         """
         Fetches a single record based on a condition.
         """
-        query = f"SELECT * FROM {self.table_name()} WHERE {condition} LIMIT 1"
-        return self.db_manager.execute_query(query, params, fetchone=True)
+        return self.db_manager.execute_query(select_query(self.table_name(), condition, limit=1), params, fetchone=True)
 
     def fetch_all(self, condition: str = None, params: tuple = ()):
         """
         Fetches all records, optionally filtered by a condition.
         """
-        query = f"SELECT * FROM {self.table_name()}"
-        if condition:
-            query += f" WHERE {condition}"
-        return self.db_manager.execute_query(query, params, fetchall=True)
+        return self.db_manager.execute_query(select_query(self.table_name(), condition), params, fetchall=True)
 
     def delete(self, condition: str, params: tuple):
         """
         Deletes records based on a condition.
         """
-        query = f"DELETE FROM {self.table_name()} WHERE {condition}"
-        self.db_manager.execute_query(query, params)
+        self.db_manager.execute_query(delete_query(self.table_name(), condition), params)
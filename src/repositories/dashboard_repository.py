@@ -1,12 +1,7 @@
 from src.repositories.db_manager import DBManager
 import pandas as pd
 
-class DashboardRepository:
-    def __init__(self):
-        self.db = DBManager()
-
-    def get_estimations_with_metadata(self, variable: str) -> pd.DataFrame:
-        query = """
+ESTIMATIONS_WITH_METADATA_QUERY = """
             SELECT
             e.run_id,
             e.variable,
@@ -22,4 +17,10 @@ class DashboardRepository:
         LEFT JOIN estimation_metadata m ON e.run_id = m.run_id
         WHERE e.variable = ?
         """
-        return pd.read_sql_query(query, self.db._connect(), params=(variable,))
+
+class DashboardRepository:
+    def __init__(self):
+        self.db = DBManager()
+
+    def get_estimations_with_metadata(self, variable: str) -> pd.DataFrame:
+        return pd.read_sql_query(ESTIMATIONS_WITH_METADATA_QUERY, self.db._connect(), params=(variable,))
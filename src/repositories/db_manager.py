@@ -1,21 +1,82 @@
 import logging
 import sqlite3
+import threading
 
 class DBManager:
+    """
+    Provides pooled SQLite connections to the outputs database.
+    Each thread reuses one connection per database file, and every connection
+    is opened with the same pragmas, so WAL journaling lets the app, dashboard
+    and generation runs read and write concurrently.
+    """
     db_path = "data/outputs.sqlite"
-    
+
+    journal_mode = "WAL"
+    synchronous = "NORMAL"
+    cache_size = -64000        # negative values are KiB, i.e. 64 MB of page cache
+    mmap_size = 268435456      # 256 MB
+    busy_timeout_ms = 5000
+
+    _local = threading.local()
+    _initialised = set()
+    _init_lock = threading.Lock()
+
     def __init__(self):
-        self._connect().execute("PRAGMA foreign_keys = ON;")
-        self._initialise_db()
+        with DBManager._init_lock:
+            if self.db_path not in DBManager._initialised:
+                self._initialise_db()
+                DBManager._initialised.add(self.db_path)
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path, check_same_thread=False)
-    
+        connections = getattr(DBManager._local, "connections", None)
+        if connections is None:
+            connections = DBManager._local.connections = {}
+
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+            self._apply_pragmas(conn)
+            connections[self.db_path] = conn
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode};")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous};")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)};")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)};")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)};")
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+    def close(self):
+        """Closes the calling thread's connection to this database."""
+        connections = getattr(DBManager._local, "connections", {})
+        conn = connections.pop(self.db_path, None)
+        if conn is not None:
+            conn.close()
+
     def _initialise_db(self):
         with self._connect() as conn:
             cursor = conn.cursor()
             cursor.executescript(self._schema())
             conn.commit()
+        self._migrate()
+
+    def _migrate(self):
+        """Applies the migrations newer than the database's user_version, in order."""
+        conn = self._connect()
+        current_version = conn.execute("PRAGMA user_version;").fetchone()[0]
+        for version, script in enumerate(self._migrations(), start=1):
+            if version <= current_version:
+                continue
+            try:
+                conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+            except sqlite3.Error:
+                # Otherwise the pooled connection keeps the half-applied migration open for the next commit
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK;")
+                logging.error(f"Database migration {version} failed and was rolled back")
+                raise
+            logging.info(f"Applied database migration {version}")
 
     def execute_query(self, query, params=(), fetchone=False, fetchall=False):
         try:
@@ -33,7 +94,59 @@ class DBManager:
                 conn.commit()
         except sqlite3.Error as e:
             logging.error(f"Database error: {e}")
-            return None        
+            return None
+
+    def execute_many(self, query, params_seq):
+        """Executes one prepared statement for every parameter tuple in a single transaction."""
+        try:
+            with self._connect() as conn:
+                conn.executemany(query, params_seq)
+        except sqlite3.Error as e:
+            logging.error(f"Database error: {e}")
+            return None
+
+    def _migrations(self) -> list[str]:
+        """
+        Schema changes applied on top of _schema(). Append new migrations to the end;
+        their position in the list is the user_version they bring the database to.
+        """
+        return [
+            # 1: secondary indexes for the repository lookups and joins
+            """
+            CREATE INDEX IF NOT EXISTS idx_populations_population_id ON populations (population_id);
+            CREATE INDEX IF NOT EXISTS idx_metadata_timestamp ON metadata (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_experiments_timestamp ON experiments (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_experiment_runs_experiment_id ON experiment_runs (experiment_id, run_number);
+            CREATE INDEX IF NOT EXISTS idx_experiment_runs_population_id ON experiment_runs (population_id);
+            CREATE INDEX IF NOT EXISTS idx_estimations_variable_run_id ON estimations (variable, run_id);
+            CREATE INDEX IF NOT EXISTS idx_estimations_run_id ON estimations (run_id);
+            """,
+            # 2: per-stage timings of generation runs, one row per batch and stage (batch is NULL outside batches)
+            """
+            CREATE TABLE IF NOT EXISTS timings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                population_id TEXT NOT NULL,
+                batch INTEGER,
+                stage TEXT NOT NULL,
+                count INTEGER,
+                total_seconds REAL,
+                max_seconds REAL,
+                FOREIGN KEY (population_id) REFERENCES metadata (population_id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_timings_population_id ON timings (population_id, batch);
+            """,
+            # 3: hash of an experiment's resolved configuration, so sweeps can skip completed configurations
+            """
+            ALTER TABLE experiments ADD COLUMN config_hash TEXT;
+            CREATE INDEX IF NOT EXISTS idx_experiments_config_hash ON experiments (config_hash);
+            """,
+            # 4: tokens reported by the LLM requests of each batch, recorded on their llm_request timings
+            """
+            ALTER TABLE timings ADD COLUMN prompt_tokens INTEGER DEFAULT 0;
+            ALTER TABLE timings ADD COLUMN completion_tokens INTEGER DEFAULT 0;
+            ALTER TABLE timings ADD COLUMN cached_tokens INTEGER DEFAULT 0;
+            """,
+        ]
 
     def _schema(self):
         return """
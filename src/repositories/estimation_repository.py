@@ -6,3 +6,6 @@ class EstimationRepository(BaseRepository):
 
     def insert_estimation(self, estimation: dict):
         self.insert(estimation)
+
+    def insert_estimations(self, estimations: list[dict]):
+        self.insert_many(estimations)
@@ -1,6 +1,8 @@
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, select_query
 from typing import Dict, Any, Tuple
 
+RUNS_BY_EXPERIMENT_ID_QUERY = select_query("experiment_runs", "experiment_id = ?")
+
 class ExperimentRunRepository(BaseRepository):
     """Handles database operations for the experiment_runs table."""
 
@@ -13,5 +15,5 @@ class ExperimentRunRepository(BaseRepository):
 
     def get_runs_by_experiment_id(self, experiment_id: str) -> Tuple:
         """Fetches experiment run for a specific population."""
-        return self.fetch_all("experiment_id = ?", (experiment_id,))
+        return self.db_manager.execute_query(RUNS_BY_EXPERIMENT_ID_QUERY, (experiment_id,), fetchall=True)
     
\ No newline at end of file
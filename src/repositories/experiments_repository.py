@@ -1,6 +1,10 @@
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, select_query
 from typing import Dict, Any, List, Tuple
 
+EXPERIMENTS_NEWEST_FIRST_QUERY = select_query("experiments", "1=1 ORDER BY timestamp DESC")
+EXPERIMENT_BY_ID_QUERY = select_query("experiments", "experiment_id = ?", limit=1)
+EXPERIMENT_BY_CONFIG_HASH_QUERY = select_query("experiments", "config_hash = ? ORDER BY timestamp", limit=1)
+
 class ExperimentsRepository(BaseRepository):
     """Handles database operations for the experiments table."""
 
@@ -11,9 +15,17 @@ class ExperimentsRepository(BaseRepository):
         """Inserts experiment experiment into the database."""
         self.insert(experiment)
     
+    def update_execution_time(self, experiment_id: str, execution_time: float):
+        """Records the total execution time once all runs of an experiment have finished."""
+        self.update({"execution_time": execution_time}, "experiment_id = ?", (experiment_id,))
+    
     def get_all_experiments(self) -> List[Tuple]:
         """Fetches all experiment IDs and timestamps, sorted by newest first."""
-        return self.fetch_all("1=1 ORDER BY timestamp DESC", ())
+        return self.db_manager.execute_query(EXPERIMENTS_NEWEST_FIRST_QUERY, fetchall=True)
     
     def get_by_id(self, experiment_id: str) -> Tuple:
-        return self.fetch_one("experiment_id = ?", (experiment_id,))
+        return self.db_manager.execute_query(EXPERIMENT_BY_ID_QUERY, (experiment_id,), fetchone=True)
+
+    def get_by_config_hash(self, config_hash: str) -> Tuple:
+        """Fetches the earliest experiment run with the given configuration."""
+        return self.db_manager.execute_query(EXPERIMENT_BY_CONFIG_HASH_QUERY, (config_hash,), fetchone=True)
@@ -1,6 +1,9 @@
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, select_query
 from typing import Dict, Any, List, Tuple
 
+METADATA_BY_POPULATION_ID_QUERY = select_query("metadata", "population_id = ?", limit=1)
+POPULATIONS_NEWEST_FIRST_QUERY = select_query("metadata", "1=1 ORDER BY timestamp DESC")
+
 class MetadataRepository(BaseRepository):
     """Handles database operations for the metadata table."""
 
@@ -13,8 +16,8 @@ class MetadataRepository(BaseRepository):
 
     def get_metadata_by_population_id(self, population_id: str) -> Tuple:
         """Fetches metadata for a specific population."""
-        return self.fetch_one("population_id = ?", (population_id,))
+        return self.db_manager.execute_query(METADATA_BY_POPULATION_ID_QUERY, (population_id,), fetchone=True)
     
     def get_all_populations(self) -> List[Tuple]:
         """Fetches all population IDs and timestamps, sorted by newest first."""
-        return self.fetch_all("1=1 ORDER BY timestamp DESC", ())
+        return self.db_manager.execute_query(POPULATIONS_NEWEST_FIRST_QUERY, fetchall=True)
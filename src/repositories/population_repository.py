@@ -1,7 +1,9 @@
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, select_query
 from typing import List, Dict, Any
 import uuid
 
+POPULATION_BY_ID_QUERY = select_query("populations", "population_id = ?")
+
 class PopulationRepository(BaseRepository):
     """Handles database operations for the populations table."""
     
@@ -9,11 +11,12 @@ class PopulationRepository(BaseRepository):
         return "populations"
     
     def insert_population(self, population_id: str, households: List[List[Dict[str, Any]]]):
-        """Inserts multiple households into the populations table."""
+        """Inserts multiple households into the populations table in a single transaction."""
+        rows = []
         for household in households:
             household_id = str(uuid.uuid4())
             for person in household:
-                self.insert({
+                rows.append({
                     "id": str(uuid.uuid4()),
                     "population_id": population_id,
                     "household_id": household_id,
@@ -24,7 +27,8 @@ class PopulationRepository(BaseRepository):
                     "occupation": person.get("occupation", ""),
                     "relationship": person.get("relationship_to_head", "")
                 })
+        self.insert_many(rows)
 
     def get_population_by_id(self, population_id: str) -> List[Dict[str, Any]]:
         """Fetches all individuals belonging to a specific population."""
-        return self.fetch_all("population_id = ?", (population_id,))
+        return self.db_manager.execute_query(POPULATION_BY_ID_QUERY, (population_id,), fetchall=True)
@@ -0,0 +1,107 @@
+"""
+Checks that the repository queries against outputs.sqlite use indexes.
+
+Runs EXPLAIN QUERY PLAN for the queries the repositories and dashboard issue, which are
+imported from the repository modules, and for the child-table lookups SQLite makes for
+ON DELETE CASCADE. Prints each plan, and exits with a non-zero status if any of them
+scans one of the large tables instead of searching an index.
+
+Usage:
+    python -m src.repositories.query_plan_audit [--db data/outputs.sqlite]
+"""
+import argparse
+import sqlite3
+import sys
+from typing import Dict, List, Tuple
+
+from src.repositories.base_repository import delete_query, select_query
+from src.repositories.dashboard_repository import ESTIMATIONS_WITH_METADATA_QUERY
+from src.repositories.db_manager import DBManager
+from src.repositories.experiment_runs_repository import RUNS_BY_EXPERIMENT_ID_QUERY
+from src.repositories.experiments_repository import (
+    EXPERIMENT_BY_CONFIG_HASH_QUERY,
+    EXPERIMENT_BY_ID_QUERY,
+    EXPERIMENTS_NEWEST_FIRST_QUERY,
+)
+from src.repositories.metadata_repository import METADATA_BY_POPULATION_ID_QUERY, POPULATIONS_NEWEST_FIRST_QUERY
+from src.repositories.population_repository import POPULATION_BY_ID_QUERY
+from src.repositories.timings_repository import (
+    TIMINGS_BY_POPULATION_ID_QUERY,
+    USAGE_BY_EXPERIMENT_QUERY,
+    USAGE_BY_POPULATION_QUERY,
+)
+
+# Tables that grow with every run; a full scan of these is treated as a failure
+HOT_TABLES = {"populations", "estimations", "experiment_runs", "timings"}
+
+# (name, query, params, table aliases used in the query)
+AUDITED_QUERIES: List[Tuple[str, str, tuple, Dict[str, str]]] = [
+    ("population by id", POPULATION_BY_ID_QUERY, ("",), {}),
+    ("metadata by population id", METADATA_BY_POPULATION_ID_QUERY, ("",), {}),
+    ("populations newest first", POPULATIONS_NEWEST_FIRST_QUERY, (), {}),
+    ("experiments newest first", EXPERIMENTS_NEWEST_FIRST_QUERY, (), {}),
+    ("experiment by id", EXPERIMENT_BY_ID_QUERY, ("",), {}),
+    ("experiment by config hash", EXPERIMENT_BY_CONFIG_HASH_QUERY, ("",), {}),
+    ("runs by experiment id", RUNS_BY_EXPERIMENT_ID_QUERY, ("",), {}),
+    ("timings by population id", TIMINGS_BY_POPULATION_ID_QUERY, ("",), {}),
+    ("estimations with metadata", ESTIMATIONS_WITH_METADATA_QUERY, ("",), {"e": "estimations", "m": "estimation_metadata"}),
+    ("token usage by population", USAGE_BY_POPULATION_QUERY, ("",), {"t": "timings", "m": "metadata"}),
+    ("token usage by experiment", USAGE_BY_EXPERIMENT_QUERY, ("",), {"r": "experiment_runs", "t": "timings", "m": "metadata"}),
+    # Child rows SQLite looks up when a parent row is deleted (ON DELETE CASCADE)
+    ("population delete", delete_query("populations", "population_id = ?"), ("",), {}),
+    ("runs by population id", select_query("experiment_runs", "population_id = ?"), ("",), {}),
+    ("estimations by run id", select_query("estimations", "run_id = ?"), ("",), {}),
+]
+
+
+def explain(conn: sqlite3.Connection, query: str, params: tuple) -> List[str]:
+    """Returns the detail column of each EXPLAIN QUERY PLAN row."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+
+def full_scans(plan: List[str], aliases: Dict[str, str]) -> List[str]:
+    """Returns the hot tables the plan reads with a full table scan."""
+    scanned = []
+    for detail in plan:
+        parts = detail.split()
+        if len(parts) < 2 or parts[0] != "SCAN":
+            continue
+        table = aliases.get(parts[1], parts[1])
+        if table in HOT_TABLES:
+            scanned.append(table)
+    return scanned
+
+
+def audit(conn: sqlite3.Connection, verbose: bool = True) -> List[Tuple[str, str]]:
+    """Explains every audited query and returns (query name, table) for each full scan found."""
+    failures = []
+    for name, query, params, aliases in AUDITED_QUERIES:
+        plan = explain(conn, query, params)
+        scanned = full_scans(plan, aliases)
+        if verbose:
+            print(f"{'FAIL' if scanned else 'ok  '} {name}")
+            for detail in plan:
+                print(f"       {detail}")
+        failures.extend((name, table) for table in scanned)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit query plans of the outputs database.")
+    parser.add_argument("--db", default=DBManager.db_path, help="Path to the SQLite database")
+    args = parser.parse_args()
+
+    DBManager.db_path = args.db
+    db = DBManager()  # applies any pending migrations
+    failures = audit(db._connect())
+
+    if failures:
+        print(f"\n{len(failures)} full scan(s) of large tables:")
+        for name, table in failures:
+            print(f"  {name}: SCAN {table}")
+        sys.exit(1)
+    print("\nAll audited queries use indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from src.repositories.base_repository import BaseRepository, select_query
+from typing import Any, Dict, List
+
+TIMINGS_BY_POPULATION_ID_QUERY = select_query("timings", "population_id = ? ORDER BY batch, stage")
+
+USAGE_COLUMNS = """
+            SUM(t.count) AS requests,
+            SUM(t.prompt_tokens) AS prompt_tokens,
+            SUM(t.completion_tokens) AS completion_tokens,
+            SUM(t.cached_tokens) AS cached_tokens,
+            SUM(t.total_seconds) AS request_seconds"""
+
+USAGE_BY_POPULATION_QUERY = f"""
+        SELECT t.batch, m.model,{USAGE_COLUMNS}
+        FROM timings t
+        JOIN metadata m ON m.population_id = t.population_id
+        WHERE t.population_id = ? AND t.stage = 'llm_request'
+        GROUP BY t.batch
+        ORDER BY t.batch
+        """
+
+USAGE_BY_EXPERIMENT_QUERY = f"""
+        SELECT r.run_number, r.population_id, m.model,{USAGE_COLUMNS}
+        FROM experiment_runs r
+        JOIN metadata m ON m.population_id = r.population_id
+        JOIN timings t ON t.population_id = r.population_id AND t.stage = 'llm_request'
+        WHERE r.experiment_id = ?
+        GROUP BY r.population_id
+        ORDER BY r.run_number
+        """
+
+class TimingsRepository(BaseRepository):
+    """Handles database operations for the timings table."""
+
+    def table_name(self) -> str:
+        return "timings"
+
+    def insert_timings(self, population_id: str, rows: List[Dict[str, Any]]):
+        """Inserts the per-batch stage timings of a population in a single transaction."""
+        self.insert_many([{"population_id": population_id, **row} for row in rows])
+
+    def get_timings_by_population_id(self, population_id: str) -> List[Dict[str, Any]]:
+        """Fetches the stage timings of a population, ordered by batch."""
+        return self.db_manager.execute_query(TIMINGS_BY_POPULATION_ID_QUERY, (population_id,), fetchall=True)
+
+    def get_usage_by_population_id(self, population_id: str) -> List[Dict[str, Any]]:
+        """Fetches the requests, tokens and request time of each batch of a population, with the population's model."""
+        return self.db_manager.execute_query(USAGE_BY_POPULATION_QUERY, (population_id,), fetchall=True)
+
+    def get_usage_by_experiment_id(self, experiment_id: str) -> List[Dict[str, Any]]:
+        """Fetches the requests, tokens and request time of each run of an experiment, with the run's model."""
+        return self.db_manager.execute_query(USAGE_BY_EXPERIMENT_QUERY, (experiment_id,), fetchall=True)
@@ -0,0 +1,31 @@
+"""
+Runs the experiments described by a TOML spec (see src/services/experiment_spec.py),
+skipping configurations whose runs are already in the database.
+
+Usage:
+    python -m src.run_experiments experiments/global.toml [--dry-run] [--max-workers 8]
+"""
+import argparse
+from src.services.experiment_scheduler import ExperimentScheduler
+from src.services.experiment_spec import load_spec
+
+
+def run_spec_file(path: str, dry_run: bool = False, **executor_overrides):
+    spec = load_spec(path)
+    scheduler = ExperimentScheduler.from_spec(spec, **executor_overrides)
+    return scheduler.run(spec, dry_run=dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the experiments of a spec file.")
+    parser.add_argument("spec", help="Path to the TOML experiment spec")
+    parser.add_argument("--dry-run", action="store_true", help="Print the configurations and their missing runs without running them")
+    parser.add_argument("--max-workers", type=int, help="Overrides the spec's executor.max_workers")
+    args = parser.parse_args()
+
+    overrides = {"max_workers": args.max_workers} if args.max_workers else {}
+    run_spec_file(args.spec, dry_run=args.dry_run, **overrides)
+
+
+if __name__ == "__main__":
+    main()
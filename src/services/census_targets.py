@@ -0,0 +1,137 @@
+import os
+import re
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class CategoricalTarget:
+    """
+    A census distribution stored as aligned arrays: one category label per row of `values`.
+    `values` is 1-D for a single distribution, or 2-D with one column per entry of `columns`.
+    The arrays are shared between callers and must not be modified.
+    """
+
+    def __init__(self, categories: np.ndarray, values: np.ndarray, columns: Optional[List[str]] = None):
+        self.categories = categories
+        self.values = values
+        self.columns = columns
+        self.categories.flags.writeable = False
+        self.values.flags.writeable = False
+
+    def to_dict(self) -> Dict[Hashable, float]:
+        return dict(zip(self.categories.tolist(), self.values.tolist()))
+
+    def to_frame(self, index_name: str) -> pd.DataFrame:
+        df = pd.DataFrame(self.values.copy(), columns=self.columns)
+        df.insert(0, index_name, self.categories.copy())
+        return df
+
+
+class CensusTargets:
+    """
+    Registry of the processed census targets in data/aggregate/processed/<location>/.
+    Each file is parsed once per location and kept in memory, and an entry is reloaded
+    when its file's modification time changes. Location names are normalised, so
+    "Newcastle upon Tyne, UK" and "newcastle_upon_tyne" share the same entries.
+    """
+
+    CENSUS_DATA = os.path.join(os.path.dirname(__file__), "../../data/aggregate/processed/")
+
+    def __init__(self, census_dir: Optional[str] = None):
+        self.census_dir = census_dir or self.CENSUS_DATA
+        self._entries: Dict[Tuple[str, str], Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_location(location: str) -> str:
+        return location.split(",")[0].replace(" ", "_").strip().lower()
+
+    def path(self, location: str, filename: str) -> str:
+        return os.path.join(self.census_dir, self.normalize_location(location), filename)
+
+    def household_size(self, location: str) -> CategoricalTarget:
+        return self._get(location, "household_size.csv", lambda df: _categorical(df, exclude_category_1=0))
+
+    def household_composition(self, location: str) -> CategoricalTarget:
+        return self._get(location, "household_composition.csv", _categorical)
+
+    def sex(self, location: str) -> CategoricalTarget:
+        return self._get(location, "sex.csv", _categorical)
+
+    def occupation(self, location: str) -> CategoricalTarget:
+        return self._get(location, "occupation.csv", _categorical)
+
+    def partner_age_diff(self, location: str) -> CategoricalTarget:
+        return self._get(location, "partner_age_diff.csv", _categorical)
+
+    def age_distribution(self, location: str) -> CategoricalTarget:
+        """Age group percentages summed across genders."""
+        return self._get(location, "age_group.csv", _age_distribution, key="age_distribution")
+
+    def age_pyramid(self, location: str) -> CategoricalTarget:
+        """Age group x [Male, Female] percentages, ordered by the lower bound of each age group."""
+        return self._get(location, "age_group.csv", _age_pyramid, key="age_pyramid")
+
+    def avg_household_size(self, location: str) -> float:
+        return self._get(location, "avg_household_size.csv", _scalar_value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, location: str, filename: str, parse: Callable[[pd.DataFrame], object], key: Optional[str] = None):
+        path = self.path(location, filename)
+        entry_key = (path, key or filename)
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+
+        target = parse(pd.read_csv(path))
+        with self._lock:
+            self._entries[entry_key] = (mtime, target)
+        return target
+
+
+def _categorical(df: pd.DataFrame, exclude_category_1=None) -> CategoricalTarget:
+    if exclude_category_1 is not None:
+        df = df[df["Category_1"] != exclude_category_1]
+    return CategoricalTarget(df["Category_1"].to_numpy(), df["Percentage"].to_numpy())
+
+
+def _age_distribution(df: pd.DataFrame) -> CategoricalTarget:
+    age_dist = df.groupby("Category_1")["Percentage"].sum()
+    return CategoricalTarget(age_dist.index.to_numpy(), age_dist.to_numpy())
+
+
+def _age_pyramid(df: pd.DataFrame) -> CategoricalTarget:
+    pyramid_df = df.pivot_table(
+        index="Category_1",
+        columns="Category_2",
+        values="Percentage",
+        aggfunc="sum"
+    ).fillna(0)
+
+    pyramid_df.columns = [c.strip().capitalize() for c in pyramid_df.columns]
+    pyramid_df = pyramid_df.reindex(columns=["Male", "Female"], fill_value=0)
+
+    def sort_key(label):
+        match = re.match(r"(\d+)", str(label))
+        return int(match.group(1)) if match else float("inf")
+
+    pyramid_df = pyramid_df.sort_index(key=lambda x: x.map(sort_key))
+    return CategoricalTarget(pyramid_df.index.to_numpy(), pyramid_df.to_numpy(), ["Male", "Female"])
+
+
+def _scalar_value(df: pd.DataFrame) -> float:
+    if "Value" not in df.columns:
+        raise KeyError("Expected column 'Value' not found in avg_household_size.csv")
+    return df["Value"].iloc[0]
+
+
+# Shared by FileService and every other consumer of the census targets
+census_targets = CensusTargets()
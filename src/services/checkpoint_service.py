@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+
+class CheckpointService:
+    """
+    Persists generation progress so that long runs can be resumed after a crash.
+    Each population gets a directory holding its run configuration, written once,
+    and an append-only log with one line per completed batch.
+    """
+
+    CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), "../../data/checkpoints/")
+
+    def start(self, population_id: str, config: Dict[str, Any]):
+        """Writes the run configuration and starts an empty batch log."""
+        directory = self._directory(population_id)
+        os.makedirs(directory, exist_ok=True)
+
+        tmp_path = os.path.join(directory, "config.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(config, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, os.path.join(directory, "config.json"))
+
+        open(os.path.join(directory, "batches.jsonl"), "w", encoding="utf-8").close()
+
+    def save_batch(self, population_id: str, households: List[List[Dict[str, Any]]], next_index: int, rng_state: tuple):
+        """Appends a completed batch. A partially written line is ignored on load."""
+        record = {"households": households, "next_index": next_index, "rng_state": rng_state}
+        with open(os.path.join(self._directory(population_id), "batches.jsonl"), "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def load(self, population_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the run configuration and progress up to the last completed batch, or None if there is no checkpoint."""
+        directory = self._directory(population_id)
+        config_path = os.path.join(directory, "config.json")
+        if not os.path.exists(config_path):
+            return None
+
+        with open(config_path, "r", encoding="utf-8") as file:
+            config = json.load(file)
+
+        households = []
+        next_index = 0
+        rng_state = None
+        log_path = os.path.join(directory, "batches.jsonl")
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"[WARN] Ignoring incomplete checkpoint record for {population_id}")
+                        break
+                    households.extend(record["households"])
+                    next_index = record["next_index"]
+                    rng_state = record["rng_state"]
+
+        return {"config": config, "households": households, "next_index": next_index, "rng_state": rng_state}
+
+    def delete(self, population_id: str):
+        shutil.rmtree(self._directory(population_id), ignore_errors=True)
+
+    def _directory(self, population_id: str) -> str:
+        return os.path.join(self.CHECKPOINT_DIR, population_id)
@@ -0,0 +1,279 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import pandas as pd
+from src.classifiers.household_size.base import HouseholdSizeClassifier
+from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
+from src.classifiers.household_type.base import HouseholdCompositionClassifier
+from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
+from src.llm_interface.base_llm import BaseLLM
+from src.llm_interface.rate_limiter import RateLimiter
+from src.llm_interface.request_budget import RequestBudget
+from src.services.experiment_run_service import ExperimentRunService
+from src.services.experiments_service import ExperimentService
+from src.services.metadata_service import MetadataService
+from src.services.population_service import PopulationService
+from src.services.report_service import ReportService
+from src.services.timings_service import TimingsService
+from src.utils.timing import Timings
+
+# Settings recorded on both the experiments and the metadata tables, with the defaults used when omitted
+EXPERIMENT_FLAGS = {
+    "include_stats": False,
+    "include_guidance": False,
+    "include_target": True,
+    "use_microdata": False,
+    "compute_household_size": False,
+    "no_occupation": False,
+    "no_household_composition": False,
+    "include_avg_household_size": False,
+}
+
+
+class ExperimentJob(NamedTuple):
+    experiment_id: str
+    run_number: int
+    model: BaseLLM
+    prompt: str
+    location: str
+    # Remaining keyword arguments of PopulationService.generate_households
+    settings: Dict[str, Any]
+
+
+class JobResult(NamedTuple):
+    experiment_id: str
+    location: str
+    run_number: int
+    population_id: Optional[str]
+    succeeded: bool
+    attempts: int
+    execution_time: float
+    error: Optional[str] = None
+
+
+def provider_name(model: BaseLLM) -> str:
+    return type(model).__name__
+
+
+class ExperimentExecutor:
+    """
+    Runs the (location, run) jobs of one or more experiments concurrently on a thread pool.
+    Jobs are independent, so a sweep takes about as long as its slowest jobs rather than their sum.
+
+    - `max_workers` bounds how many jobs run at once
+    - `budgets` maps a provider (the model class name, e.g. "OpenAIModel") to a RequestBudget
+      shared by every job using that provider, capping its concurrent requests
+    - `rate_limits` maps a provider, or a provider endpoint as "OpenAIModel:gpt-4o", to a
+      RateLimiter for its requests and tokens per minute; an endpoint entry takes precedence
+    - a job that raises is retried up to `job_retries` times, resuming from its checkpoint when
+      it got as far as completing a batch
+
+    Each experiment row is saved when it is added; a job's metadata, population, timings and
+    experiment run are saved when it succeeds, and an experiment's execution time is recorded
+    once all of its jobs have finished.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        budgets: Optional[Dict[str, RequestBudget]] = None,
+        rate_limits: Optional[Dict[str, RateLimiter]] = None,
+        job_retries: int = 2,
+        retry_delay: float = 5.0,
+        generate_reports: bool = True
+    ):
+        self.max_workers = max_workers
+        self.budgets = budgets or {}
+        self.rate_limits = rate_limits or {}
+        self.job_retries = job_retries
+        self.retry_delay = retry_delay
+        self.generate_reports = generate_reports
+        self.jobs: List[ExperimentJob] = []
+
+        self.population_service = PopulationService()
+        self.report_service = ReportService()
+        self.metadata_service = MetadataService()
+        self.experiments_service = ExperimentService()
+        self.experiment_run_service = ExperimentRunService()
+        self.timings_service = TimingsService()
+
+        self._experiment_jobs_left: Dict[str, int] = {}
+        self._experiment_started: Dict[str, float] = {}
+        self._experiment_previous_time: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_experiment(
+        self,
+        model: BaseLLM,
+        prompt: str,
+        schema: Dict[str, Any],
+        location: str,
+        n_runs: int = 1,
+        hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(),
+        hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier(),
+        config_hash: Optional[str] = None,
+        **settings
+    ) -> str:
+        """
+        Saves an experiment and queues one job per run. `settings` are passed on to
+        PopulationService.generate_households (n_households, region, batch_size, include_stats, ...).
+        Returns the experiment id.
+        """
+        experiment_id = str(uuid.uuid4())
+        settings = self._settings(settings, schema, hh_type_classifier, hh_size_classifier)
+        self.experiments_service.save_experiment({
+            "experiment_id": experiment_id,
+            **self._describe(model, prompt, location, settings),
+            "execution_time": None,
+            "config_hash": config_hash,
+        })
+        self._queue(experiment_id, range(n_runs), model, prompt, location, settings)
+        return experiment_id
+
+    def add_runs(
+        self,
+        experiment: Dict[str, Any],
+        run_numbers: Iterable[int],
+        model: BaseLLM,
+        prompt: str,
+        schema: Dict[str, Any],
+        hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(),
+        hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier(),
+        **settings
+    ):
+        """
+        Queues further runs of an experiment saved earlier, such as the runs an interrupted sweep
+        did not finish. Their time is added to the experiment's existing execution time.
+        """
+        settings = self._settings(settings, schema, hh_type_classifier, hh_size_classifier)
+        self._queue(experiment["experiment_id"], run_numbers, model, prompt, experiment["location"], settings, experiment["execution_time"] or 0.0)
+
+    def _queue(self, experiment_id: str, run_numbers: Iterable[int], model: BaseLLM, prompt: str, location: str, settings: Dict[str, Any], previous_time: float = 0.0):
+        budget = self.budgets.get(provider_name(model))
+        if budget is not None:
+            model.use_request_budget(budget)
+        limiter = self.rate_limits.get(f"{provider_name(model)}:{model.model_name}") or self.rate_limits.get(provider_name(model))
+        if limiter is not None:
+            model.use_rate_limiter(limiter)
+
+        run_numbers = list(run_numbers)
+        self._experiment_jobs_left[experiment_id] = len(run_numbers)
+        self._experiment_previous_time[experiment_id] = previous_time
+        for run in run_numbers:
+            self.jobs.append(ExperimentJob(experiment_id, run, model, prompt, location, settings))
+
+    @staticmethod
+    def _settings(settings: Dict[str, Any], schema: Dict[str, Any], hh_type_classifier: HouseholdCompositionClassifier, hh_size_classifier: HouseholdSizeClassifier) -> Dict[str, Any]:
+        return {**EXPERIMENT_FLAGS, **settings, "schema": schema, "hh_type_classifier": hh_type_classifier, "hh_size_classifier": hh_size_classifier}
+
+    def run(self) -> List[JobResult]:
+        """Runs every queued job and returns their results in completion order."""
+        jobs, self.jobs = self.jobs, []
+        print(f"[INFO] Running {len(jobs)} jobs with up to {self.max_workers} at a time")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                status = "done" if result.succeeded else f"FAILED ({result.error})"
+                print(f"[INFO] {result.location} run {result.run_number + 1}: {status} after {result.attempts} attempt(s), {result.execution_time:.1f}s")
+
+        failed = sum(not result.succeeded for result in results)
+        print(f"[INFO] {len(results) - failed} of {len(results)} jobs succeeded")
+        return results
+
+    def _run_job(self, job: ExperimentJob) -> JobResult:
+        with self._lock:
+            self._experiment_started.setdefault(job.experiment_id, time.time())
+
+        population_id = str(uuid.uuid4())
+        timings = Timings()
+        start_time = time.time()
+        attempts = 0
+        error = None
+        households = None
+
+        while attempts <= self.job_retries:
+            attempts += 1
+            try:
+                if self.population_service.checkpoint_service.load(population_id) is not None:
+                    households = self.population_service.resume(population_id, job.model, timings)
+                else:
+                    households = self.population_service.generate_households(
+                        model=job.model,
+                        base_prompt=job.prompt,
+                        location=job.location,
+                        n_run=job.run_number + 1,
+                        timings=timings,
+                        population_id=population_id,
+                        **job.settings
+                    )
+                break
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+                if attempts <= self.job_retries:
+                    delay = self.retry_delay * attempts
+                    print(f"[WARNING] {job.location} run {job.run_number + 1} failed ({error}). Retrying in {delay:.0f}s...")
+                    time.sleep(delay)
+
+        execution_time = time.time() - start_time
+        succeeded = households is not None
+        if succeeded:
+            try:
+                self._save(job, population_id, households, timings, execution_time)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                succeeded = False
+
+        self._finish_experiment_job(job.experiment_id)
+        return JobResult(job.experiment_id, job.location, job.run_number, population_id if succeeded else None, succeeded, attempts, execution_time, error)
+
+    def _save(self, job: ExperimentJob, population_id: str, households: List[List[Dict[str, Any]]], timings: Timings, execution_time: float):
+        if self.generate_reports:
+            df = pd.DataFrame([person for household in households for person in household])
+            self.report_service.generate_report(population_id, df)
+
+        self.metadata_service.save_metadata({
+            "population_id": population_id,
+            **self._describe(job.model, job.prompt, job.location, job.settings),
+            "num_households": len(households),
+            "execution_time": execution_time,
+        })
+        self.population_service.save_population(population_id, households, timings)
+        self.timings_service.save_timings(population_id, timings)
+        self.experiment_run_service.save_run({
+            "experiment_id": job.experiment_id,
+            "run_number": job.run_number,
+            "population_id": population_id,
+            "execution_time": execution_time,
+        })
+
+    def _finish_experiment_job(self, experiment_id: str):
+        with self._lock:
+            self._experiment_jobs_left[experiment_id] -= 1
+            finished = self._experiment_jobs_left[experiment_id] == 0
+        if finished:
+            elapsed = time.time() - self._experiment_started[experiment_id]
+            self.experiments_service.update_execution_time(experiment_id, self._experiment_previous_time[experiment_id] + elapsed)
+
+    @staticmethod
+    def _describe(model: BaseLLM, prompt: str, location: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """The model and settings columns shared by the experiments and metadata tables."""
+        return {
+            "location": location,
+            "model": model.model_name,
+            "temperature": getattr(model, "temperature", None),
+            "top_p": getattr(model, "top_p", None),
+            "top_k": getattr(model, "top_k", None),
+            "prompt": prompt,
+            **{flag: settings[flag] for flag in EXPERIMENT_FLAGS},
+            "hh_type_classifier": settings["hh_type_classifier"].get_name(),
+            "hh_size_classifier": settings["hh_size_classifier"].get_name(),
+        }
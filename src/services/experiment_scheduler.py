@@ -0,0 +1,97 @@
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+from src.llm_interface.base_llm import BaseLLM
+from src.llm_interface.model_factory import LLMFactory
+from src.llm_interface.rate_limiter import RateLimiter
+from src.llm_interface.request_budget import RequestBudget
+from src.services.experiment_executor import ExperimentExecutor, JobResult
+from src.services.experiment_run_service import ExperimentRunService
+from src.services.experiment_spec import ResolvedExperiment, expand, resolve
+from src.services.experiments_service import ExperimentService
+from src.services.file_service import FileService
+
+
+class PlannedExperiment(NamedTuple):
+    experiment: ResolvedExperiment
+    # The experiment saved earlier with the same configuration hash, if any
+    existing: Optional[Dict[str, Any]]
+    # Run numbers still to be generated
+    runs: List[int]
+
+
+class ExperimentScheduler:
+    """
+    Runs the configurations of an experiment spec (see experiment_spec) on an ExperimentExecutor.
+    Configurations are identified by their hash: one already in the experiments table only gets
+    the runs it is missing, so re-running a spec resumes an interrupted sweep and skips finished ones.
+    """
+
+    def __init__(self, executor: ExperimentExecutor):
+        self.executor = executor
+        self.file_service = FileService()
+        self.experiments_service = ExperimentService()
+        self.experiment_run_service = ExperimentRunService()
+        self._models: Dict[str, BaseLLM] = {}
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any], **executor_overrides) -> "ExperimentScheduler":
+        """A scheduler whose executor is configured by the spec's [executor], [budgets] and [rate_limits] tables."""
+        settings = {**spec.get("executor", {}), **executor_overrides}
+        budgets = {provider: RequestBudget(**limits) for provider, limits in spec.get("budgets", {}).items()}
+        rate_limits = {endpoint: RateLimiter(endpoint, **limits) for endpoint, limits in spec.get("rate_limits", {}).items()}
+        return cls(ExperimentExecutor(budgets=budgets, rate_limits=rate_limits, **settings))
+
+    def plan(self, spec: Dict[str, Any]) -> List[PlannedExperiment]:
+        """Resolves every configuration of the spec, dropping duplicates, and works out which runs are missing."""
+        planned = []
+        seen = set()
+        for config in expand(spec):
+            experiment = resolve(config, self.file_service)
+            if experiment.config_hash in seen:
+                continue
+            seen.add(experiment.config_hash)
+
+            existing = self.experiments_service.get_by_config_hash(experiment.config_hash)
+            completed = set()
+            if existing:
+                completed = {run["run_number"] for run in self.experiment_run_service.get_by_experiment_id(existing["experiment_id"]) or []}
+            runs = [run for run in range(config["n_runs"]) if run not in completed]
+            planned.append(PlannedExperiment(experiment, existing, runs))
+        return planned
+
+    def run(self, spec: Dict[str, Any], dry_run: bool = False) -> List[JobResult]:
+        """Queues the missing runs of every configuration and runs them. With `dry_run`, only prints the plan."""
+        planned = self.plan(spec)
+        for item in planned:
+            config = item.experiment.config
+            status = f"{len(item.runs)} of {config['n_runs']} runs to go" if item.runs else "complete, skipping"
+            print(f"[INFO] {item.experiment.config_hash[:12]} {config['model'].get('model_name', config['model']['provider'])} {config['location']}: {status}")
+        if dry_run:
+            return []
+
+        for item in planned:
+            if not item.runs:
+                continue
+            experiment = item.experiment
+            model = self._model(experiment.config["model"])
+            if item.existing:
+                self.executor.add_runs(item.existing, item.runs, model, experiment.prompt, experiment.schema, **experiment.generation_settings())
+            else:
+                self.executor.add_experiment(
+                    model,
+                    experiment.prompt,
+                    experiment.schema,
+                    experiment.config["location"],
+                    n_runs=experiment.config["n_runs"],
+                    config_hash=experiment.config_hash,
+                    **experiment.generation_settings()
+                )
+        return self.executor.run()
+
+    def _model(self, settings: Dict[str, Any]) -> BaseLLM:
+        """One model instance per distinct model table, so configurations using it share its cache and budget."""
+        key = json.dumps(settings, sort_keys=True)
+        if key not in self._models:
+            settings = dict(settings)
+            self._models[key] = LLMFactory.get_provider(settings.pop("provider"), **settings)
+        return self._models[key]
@@ -0,0 +1,225 @@
+"""
+Declarative experiment specs.
+
+A spec is a TOML file with an [experiment] table of base settings and any number of [[sweep]]
+tables. Each sweep lists values for some of the settings (dotted keys such as `model.temperature`
+reach into nested tables) and expands them either as a cartesian product or, with mode = "zip",
+position by position. The expansions of separate sweeps are combined as a cartesian product, so
+
+    [experiment]
+    n_households = 300
+    model = { provider = "openai", model_name = "gpt-4o", temperature = 0.7 }
+
+    [[sweep]]
+    mode = "zip"
+    location = ["Fiji", "United Kingdom"]
+    region = ["", "E12000001"]
+
+    [[sweep]]
+    include_stats = [true, false]
+
+yields four configurations. Optional [executor], [budgets.<ModelClass>] and
+[rate_limits."<ModelClass>[:<model name>]"] tables configure the ExperimentExecutor that runs them.
+"""
+import copy
+import hashlib
+import itertools
+import json
+import tomllib
+from typing import Any, Dict, List, NamedTuple, Optional
+from src.classifiers.household_size.base import HouseholdSizeClassifier
+from src.classifiers.household_type.base import HouseholdCompositionClassifier
+from src.classifiers.registry import get_household_composition_classifier, get_household_size_classifier
+from src.services.experiment_executor import EXPERIMENT_FLAGS
+from src.services.file_service import FileService
+
+SWEEP_MODES = ("cartesian", "zip")
+
+# Settings an experiment may specify, with their defaults; None marks a required setting
+SETTINGS: Dict[str, Any] = {
+    "model": None,
+    "location": None,
+    "n_households": None,
+    "n_runs": 1,
+    "region": "",
+    "batch_size": 10,
+    **EXPERIMENT_FLAGS,
+    "hh_type_classifier": "uk_census",
+    "hh_size_classifier": "uk_census",
+    "prompt_file": None,
+    "schema_file": None,
+    "guidance_file": None,
+    "max_parallel": 4,
+    "households_per_request": 1,
+    "staleness": 0,
+}
+REQUIRED_SETTINGS = ("model", "location", "n_households")
+
+# Settings that change how a configuration is run but not what it generates; left out of its hash
+EXECUTION_SETTINGS = ("n_runs", "max_parallel")
+
+# Settings that only select the files loaded into the prompt, schema and guidance, which are hashed instead
+FILE_SETTINGS = ("prompt_file", "schema_file", "guidance_file")
+
+
+class ResolvedExperiment(NamedTuple):
+    config: Dict[str, Any]
+    prompt: str
+    schema: Dict[str, Any]
+    custom_guidance: Optional[str]
+    hh_type_classifier: HouseholdCompositionClassifier
+    hh_size_classifier: HouseholdSizeClassifier
+    config_hash: str
+
+    def generation_settings(self) -> Dict[str, Any]:
+        """Keyword arguments for ExperimentExecutor.add_experiment besides the model, prompt, schema and location."""
+        settings = {
+            key: value for key, value in self.config.items()
+            if key not in ("model", "location", "n_runs") + FILE_SETTINGS
+        }
+        settings["custom_guidance"] = self.custom_guidance
+        settings["hh_type_classifier"] = self.hh_type_classifier
+        settings["hh_size_classifier"] = self.hh_size_classifier
+        return settings
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as file:
+        return tomllib.load(file)
+
+
+def expand(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every configuration the spec describes, with defaults filled in, in sweep order."""
+    base = spec.get("experiment", {})
+    sweeps = spec.get("sweep", [])
+    if isinstance(sweeps, dict):
+        sweeps = [sweeps]
+
+    configs = []
+    for overrides in itertools.product(*[expand_sweep(sweep) for sweep in sweeps]):
+        config = copy.deepcopy(base)
+        for override in overrides:
+            for path, value in override.items():
+                _set_path(config, path, value)
+        configs.append(_with_defaults(config))
+    return configs
+
+
+def expand_sweep(sweep: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The overrides of one sweep table, each mapping a dotted setting path to a value."""
+    sweep = dict(sweep)
+    mode = sweep.pop("mode", "cartesian")
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Unknown sweep mode {mode!r}, expected one of {SWEEP_MODES}")
+
+    values = _flatten(sweep)
+    for path, options in values.items():
+        if not isinstance(options, list):
+            raise ValueError(f"Sweep values for {path!r} must be a list, got {options!r}")
+
+    paths = list(values)
+    if mode == "zip":
+        lengths = {len(options) for options in values.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Zipped sweep lists must have the same length, got {dict((path, len(options)) for path, options in values.items())}")
+        combinations = zip(*values.values())
+    else:
+        combinations = itertools.product(*values.values())
+    return [dict(zip(paths, combination)) for combination in combinations]
+
+
+def resolve(config: Dict[str, Any], file_service: Optional[FileService] = None) -> ResolvedExperiment:
+    """Loads the prompt, schema, guidance and classifiers of a configuration and computes its hash."""
+    file_service = file_service or FileService()
+
+    prompt = file_service.load_prompt(
+        config["prompt_file"] or default_prompt_file(config),
+        {"LOCATION": config["location"], "TOTAL_HOUSEHOLDS": str(config["n_households"])}
+    )
+    schema = file_service.load_schema(config["schema_file"] or default_schema_file(config))
+    guidance_file = config["guidance_file"] or default_guidance_file(config)
+    custom_guidance = file_service.load_prompt(guidance_file) if guidance_file else None
+
+    return ResolvedExperiment(
+        config=config,
+        prompt=prompt,
+        schema=schema,
+        custom_guidance=custom_guidance,
+        hh_type_classifier=get_household_composition_classifier(config["hh_type_classifier"]),
+        hh_size_classifier=get_household_size_classifier(config["hh_size_classifier"]),
+        config_hash=config_hash(config, prompt, schema, custom_guidance),
+    )
+
+
+def config_hash(config: Dict[str, Any], prompt: str, schema: Dict[str, Any], custom_guidance: Optional[str]) -> str:
+    """
+    A stable hash of everything that determines what a configuration generates. The contents of
+    the prompt, schema and guidance are hashed rather than their file names, so editing a prompt
+    file makes a new configuration.
+    """
+    hashed = {key: value for key, value in config.items() if key not in EXECUTION_SETTINGS + FILE_SETTINGS}
+    hashed["prompt"] = prompt
+    hashed["schema"] = schema
+    hashed["custom_guidance"] = custom_guidance
+    encoded = json.dumps(hashed, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def default_prompt_file(config: Dict[str, Any]) -> str:
+    if config["location"] == "Dar es Salaam":
+        return "dar_es_salaam.txt"
+    elif config["hh_type_classifier"] == "un_global":
+        return "global.txt"
+    elif config["use_microdata"]:
+        return "microdata.txt"
+    elif config["compute_household_size"]:
+        return "fixed_household_size.txt"
+    elif config["no_occupation"]:
+        return "no_occupation.txt"
+    else:
+        return "standard_prompt.txt"
+
+
+def default_schema_file(config: Dict[str, Any]) -> str:
+    if config["hh_type_classifier"] == "un_global":
+        return "household_schema_global.json"
+    elif config["no_occupation"]:
+        return "household_schema_no_occupation.json"
+    else:
+        return "household_schema.json"
+
+
+def default_guidance_file(config: Dict[str, Any]) -> Optional[str]:
+    if config["location"] == "Dar es Salaam" and config["include_target"]:
+        return "dar_es_salaam_guidance.txt"
+    return None
+
+
+def _with_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = set(config) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown experiment settings: {', '.join(sorted(unknown))}")
+    missing = [key for key in REQUIRED_SETTINGS if config.get(key) is None]
+    if missing:
+        raise ValueError(f"Missing required experiment settings: {', '.join(missing)}")
+    if "provider" not in config["model"]:
+        raise ValueError(f"Model settings need a provider: {config['model']}")
+    return {**SETTINGS, **config}
+
+
+def _flatten(table: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for key, value in table.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def _set_path(config: Dict[str, Any], path: str, value: Any):
+    *parents, key = path.split(".")
+    for parent in parents:
+        config = config.setdefault(parent, {})
+    config[key] = copy.deepcopy(value)
@@ -12,7 +12,13 @@ class ExperimentService:
     
     def get_by_id(self, experiment_id: str) -> Dict[str, Any]:
         return self.experiments_repository.get_by_id(experiment_id)
+
+    def get_by_config_hash(self, config_hash: str) -> Dict[str, Any]:
+        return self.experiments_repository.get_by_config_hash(config_hash)
     
     def save_experiment(self, experiment: Dict[str, Any]):
         """Inserts experiment into the database."""
         return self.experiments_repository.insert(experiment)
+
+    def update_execution_time(self, experiment_id: str, execution_time: float):
+        return self.experiments_repository.update_execution_time(experiment_id, execution_time)
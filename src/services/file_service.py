@@ -1,14 +1,25 @@
 import os
 import json
-from typing import Optional, Union
+import threading
 import pandas as pd
-import re
+import pyarrow as pa
+
+from src.services.census_targets import CensusTargets, census_targets
+from src.utils.microdata_sampler import MicrodataSampler
 
 class FileService:
     PROMPT_DIR = os.path.join(os.path.dirname(__file__), "../prompts")
     SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "../../data/schemas/")
-    CENSUS_DATA = os.path.join(os.path.dirname(__file__), "../../data/aggregate/processed/")
     MICRODATA = os.path.join(os.path.dirname(__file__), "../../data/microdata/household_uk.tab")
+    MICRODATA_STORE = os.path.join(os.path.dirname(__file__), "../../data/microdata/household_uk")
+
+    _schemas = {}
+    # Census targets are parsed once and shared by every FileService
+    census_targets: CensusTargets = census_targets
+    # Region partitions of the microdata store, converted once and shared read-only by every caller
+    _microdata_frames = {}
+    _microdata_samplers = {}
+    _microdata_lock = threading.Lock()
 
     def load_prompt(self, filename: str, replacements: dict = None) -> str:
         """Loads a prompt from file and applies replacements."""
@@ -26,10 +37,16 @@ class FileService:
         return prompt
 
     def load_schema(self, filename: str):
-        """Loads the household validation schema from file."""
+        """
+        Loads the household validation schema from file.
+        Schemas are parsed once and the same object is returned on every call,
+        so validators compiled for it can be reused. Treat it as read-only.
+        """
         filepath = os.path.join(self.SCHEMA_PATH, filename)
-        with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+        if filepath not in FileService._schemas:
+            with open(filepath, "r", encoding="utf-8") as file:
+                FileService._schemas[filepath] = json.load(file)
+        return FileService._schemas[filepath]
 
     def load_html_report(self, report_path):
         """Reads and returns the HTML content of a report."""
@@ -40,58 +57,31 @@ class FileService:
             return None
 
     def load_household_size(self, location: str) -> dict:
-        return self._load_csv(location, "household_size.csv", 0)
+        return self.census_targets.household_size(location).to_dict()
         
     def load_age_distribution(self, location: str) -> dict:
         """Loads age distribution data aggregated across genders."""
         try:
-            path = os.path.join(self.CENSUS_DATA, location.split(",")[0].replace(" ", "_").strip().lower(), "age_group.csv")
-            df = pd.read_csv(path)
-            
-            # Aggregate percentages by age group (Category_1), summing across genders
-            age_dist = df.groupby("Category_1")["Percentage"].sum().to_dict()
-            
-            return age_dist
+            return self.census_targets.age_distribution(location).to_dict()
         except Exception as e:
             print(f"Error loading age distribution for {location}: {e}")
             return {}
         
     def load_household_composition(self, location: str) -> dict:
-        return self._load_csv(location, "household_composition.csv")
+        return self.census_targets.household_composition(location).to_dict()
 
     def load_age_pyramid(self, location: str) -> pd.DataFrame:
         try:
-            path = os.path.join(self.CENSUS_DATA, location.split(",")[0].replace(" ", "_").strip().lower(), "age_group.csv")
-            df = pd.read_csv(path)
-
-            pyramid_df = df.pivot_table(
-                index="Category_1",
-                columns="Category_2",
-                values="Percentage",
-                aggfunc="sum"
-            ).fillna(0)
-
-            pyramid_df.columns = [c.strip().capitalize() for c in pyramid_df.columns]
-            pyramid_df = pyramid_df.reindex(columns=["Male", "Female"], fill_value=0)
-
-            def sort_key(label):
-                match = re.match(r"(\d+)", str(label))
-                return int(match.group(1)) if match else float("inf")
-
-            pyramid_df = pyramid_df.sort_index(key=lambda x: x.map(sort_key))
-            pyramid_df = pyramid_df.reset_index().rename(columns={"Category_1": "age_group"})
-
-            return pyramid_df
-
+            return self.census_targets.age_pyramid(location).to_frame("age_group")
         except Exception as e:
             print(f"Failed to load age pyramid for {location}: {e}")
             return pd.DataFrame(columns=["Male", "Female"])
 
     def load_occupation_distribution(self, location: str) -> dict:
-        return self._load_csv(location, "occupation.csv")
+        return self.census_targets.occupation(location).to_dict()
     
     def load_sex_distribution(self, location: str) -> dict:
-        return self._load_csv(location, "sex.csv")
+        return self.census_targets.sex(location).to_dict()
 
     def generate_unique_filename(self, directory: str, base_filename: str) -> str:
         os.makedirs(directory, exist_ok=True)
@@ -107,7 +97,14 @@ class FileService:
         return filepath
     
     def load_microdata(self, region: str) -> pd.DataFrame:
+        """
+        Loads the microdata records of one region. Reads the region's partition of the
+        columnar store when it exists (see src/preprocessing/convert_microdata.py),
+        otherwise parses the full tab-separated extract and filters it.
+        """
         try:
+            if os.path.isdir(self.MICRODATA_STORE):
+                return self._load_microdata_partition(region)
             df = pd.read_csv(self.MICRODATA, sep="\t", dtype={"iol22cd": str})
             df = df[df["region"] == region]
             return df
@@ -115,29 +112,41 @@ class FileService:
             print(f"Error loading microdata for {region}: {e}")
             return pd.DataFrame()
         
+    def _load_microdata_partition(self, region: str) -> pd.DataFrame:
+        path = os.path.join(self.MICRODATA_STORE, f"region={region}", "part-0.arrow")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        with FileService._microdata_lock:
+            df = FileService._microdata_frames.get(path)
+            if df is None:
+                # The file is memory-mapped, so processes reading the same region share the OS page cache
+                table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+                df = table.to_pandas().set_index("row_id")
+                df.index.name = None
+                df.insert(0, "region", region)
+                FileService._microdata_frames[path] = df
+        return df
+
+    def load_microdata_sampler(self, region: str) -> MicrodataSampler:
+        """
+        Returns the region's anchor sampler, built once and cached alongside the microdata.
+        Its draws are index labels of the frame returned by load_microdata(region).
+        """
+        with FileService._microdata_lock:
+            sampler = FileService._microdata_samplers.get(region)
+        if sampler is None:
+            sampler = MicrodataSampler(self.load_microdata(region))
+            with FileService._microdata_lock:
+                FileService._microdata_samplers[region] = sampler
+        return sampler
+
     def load_avg_household_size(self, location: str) -> float:
         try:
-            df = pd.read_csv(os.path.join(self.CENSUS_DATA, location.split(",")[0].replace(" ", "_").strip().lower(), "avg_household_size.csv"))
-            if "Value" in df.columns:
-                return df["Value"].iloc[0]
-            else:
-                raise KeyError("Expected column 'Value' not found in avg_household_size.csv")
+            return self.census_targets.avg_household_size(location)
         except Exception as e:
             print(f"Error loading average household size for {location}: {e}")
             return 0.0
         
     def load_partner_age_diff(self, location: str) -> dict:
-        return self._load_csv(location, "partner_age_diff.csv")
-    
-    def _load_csv(self, location: str, filename: str, exclude_category_1: Optional[Union[str, int, float]] = None) -> pd.DataFrame:
-        path = os.path.join(
-            self.CENSUS_DATA,
-            location.split(",")[0].replace(" ", "_").strip().lower(),
-            filename
-        )
-        df = pd.read_csv(path)
-
-        if exclude_category_1 is not None:
-            df = df[df["Category_1"] != exclude_category_1]
-
-        return dict(zip(df["Category_1"], df["Percentage"]))
+        return self.census_targets.partner_age_diff(location).to_dict()
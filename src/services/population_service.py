@@ -1,3 +1,5 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 import random
 import pandas as pd
@@ -6,19 +8,25 @@ from src.classifiers.household_size.uk_census import UKHouseholdSizeClassifier
 from src.classifiers.household_type.base import HouseholdCompositionClassifier
 from src.classifiers.household_type.uk_census import UKHouseholdCompositionClassifier
 from src.prompts.statistics_feedback import update_prompt_with_statistics as prepare_prompt
+from src.analysis.population_stats import PopulationStatsAccumulator
 from src.services.file_service import FileService
+from src.services.checkpoint_service import CheckpointService
+from src.classifiers.registry import get_household_composition_classifier, get_household_size_classifier
 from src.repositories.population_repository import PopulationRepository
 from src.llm_interface.base_llm import BaseLLM
 from src.utils.microdata_decoder import convert_microdata_row
 from src.utils.microdata_sampler import sample_microdata
+from src.utils.timing import BATCH, CHECKPOINT_WRITE, DB_WRITE, PROMPT_BUILD, STATS_UPDATE, Timings, span
 
 class PopulationService:
     population_repository: PopulationRepository
     file_service: FileService
+    checkpoint_service: CheckpointService
 
     def __init__(self):
         self.population_repository = PopulationRepository()
         self.file_service = FileService()
+        self.checkpoint_service = CheckpointService()
 
     def generate_households(
         self,
@@ -40,60 +48,91 @@ class PopulationService:
         include_avg_household_size: bool = False,
         custom_guidance: Optional[str] = None,
         hh_type_classifier: HouseholdCompositionClassifier = UKHouseholdCompositionClassifier(),
-        hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier()
+        hh_size_classifier: HouseholdSizeClassifier = UKHouseholdSizeClassifier(),
+        max_parallel: int = 4,
+        households_per_request: int = 1,
+        staleness: int = 0,
+        timings: Optional[Timings] = None,
+        population_id: Optional[str] = None,
+        seed: Optional[int] = None,
+        checkpoint: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        
-        households = []
-        size_plan = self._plan_household_sizes(n_households, location) if compute_household_size else [None] * n_households
-
-        if use_microdata:
-            microdata_df = self.file_service.load_microdata(region)
-            sampled_rows = sample_microdata(microdata_df, n_households)
-        
-        prompt = prepare_prompt(
-            base_prompt,
-            synthetic_df=None,
-            location=location,
-            n_households_generated=0,
-            include_stats=include_stats,
-            include_guidance=include_guidance,
-            use_microdata=use_microdata,
-            include_target=include_target,
-            no_occupation=no_occupation,
-            no_household_composition=no_household_composition,
-            include_avg_household_size=include_avg_household_size,
-            custom_guidance=custom_guidance,
-            hh_type_classifier=hh_type_classifier,
-            hh_size_classifier=hh_size_classifier
+        """
+        Generates households in batches, feeding statistics of the population so far back into the prompt.
+        With `households_per_request` > 1, each LLM call returns that many households, so the shared
+        statistics preamble is sent once per group; invalid households are regenerated individually.
+        When `population_id` is given, progress is checkpointed after every batch so the run can be resumed.
+        With `staleness` > 0, batches are pipelined: the next batch is dispatched while up to `staleness`
+        earlier ones are still generating, using feedback from the batches completed so far, so the
+        provider is kept busy while results are validated and the statistics are updated.
+        Pass `timings` to record how long each stage of each batch takes.
+        The size plan and microdata anchors are drawn from a generator of the run's own, seeded
+        with `seed`, so concurrent runs do not share random state and seeded runs are reproducible.
+        `checkpoint` is the state loaded by `resume` and should not be passed directly.
+        """
+        population_stats = PopulationStatsAccumulator(
+            hh_size_classifier,
+            None if no_household_composition else hh_type_classifier,
+            relationship_col="relationship_to_head"
         )
 
-        for i in range(0, n_households, batch_size):
-            batch_count = min(batch_size, n_households - i)
-            is_last_batch = (i + batch_count) >= n_households
+        rng = random.Random(seed)
+        if checkpoint is not None:
+            households = checkpoint["households"]
+            population_stats.add_households(households)
+            size_plan = checkpoint["config"]["size_plan"]
+            start = checkpoint["next_index"]
+            if checkpoint["rng_state"] is not None:
+                version, internal_state, gauss_next = checkpoint["rng_state"]
+                rng.setstate((version, tuple(internal_state), gauss_next))
+        else:
+            households = []
+            size_plan = self._plan_household_sizes(n_households, location, rng) if compute_household_size else [None] * n_households
+            start = 0
 
-            print(f"\n--- Generating Batch {i // batch_size + 1} ({batch_count} households), Run {n_run} ---")
-
-            batch_prompts = self._prepare_batch_prompts(
-                prompt,
-                size_plan[i:i+batch_count],
-                sampled_rows.iloc[i:i+batch_count] if use_microdata else None
-            )
-
-            print(f"Prompt (first in batch): {batch_prompts[0]}")
-
-            batch_results = self._run_batch(model, batch_prompts, schema)
-            households.extend(batch_results)
+        if use_microdata:
+            microdata_df = self.file_service.load_microdata(region)
+            if checkpoint is not None:
+                sampled_rows = microdata_df.loc[checkpoint["config"]["microdata_index"]]
+            else:
+                sampler = self.file_service.load_microdata_sampler(region)
+                sampled_rows = sample_microdata(microdata_df, n_households, random_state=rng.getrandbits(64), sampler=sampler)
 
-            if not is_last_batch:
-                synthetic_df = pd.DataFrame(
-                    [dict(**person, household_id=i + 1) for i, household in enumerate(households) for person in household]
-                )
+        if population_id is not None and checkpoint is None:
+            self.checkpoint_service.start(population_id, {
+                "n_households": n_households,
+                "base_prompt": base_prompt,
+                "schema": schema,
+                "location": location,
+                "region": region,
+                "batch_size": batch_size,
+                "include_stats": include_stats,
+                "include_guidance": include_guidance,
+                "use_microdata": use_microdata,
+                "compute_household_size": compute_household_size,
+                "include_target": include_target,
+                "no_occupation": no_occupation,
+                "n_run": n_run,
+                "no_household_composition": no_household_composition,
+                "include_avg_household_size": include_avg_household_size,
+                "custom_guidance": custom_guidance,
+                "hh_type_classifier": hh_type_classifier.get_name(),
+                "hh_size_classifier": hh_size_classifier.get_name(),
+                "max_parallel": max_parallel,
+                "households_per_request": households_per_request,
+                "staleness": staleness,
+                "seed": seed,
+                "size_plan": size_plan,
+                "microdata_index": sampled_rows.index.tolist() if use_microdata else None,
+            })
 
-                prompt = prepare_prompt(
+        def feedback_prompt(n_households_generated: int, batch_timings: Optional[Timings]) -> str:
+            with span(batch_timings, PROMPT_BUILD):
+                return prepare_prompt(
                     base_prompt,
-                    synthetic_df=synthetic_df,
+                    synthetic_df=None,
                     location=location,
-                    n_households_generated=(i + batch_count),
+                    n_households_generated=n_households_generated,
                     include_stats=include_stats,
                     include_guidance=include_guidance,
                     use_microdata=use_microdata,
@@ -103,12 +142,68 @@ class PopulationService:
                     include_avg_household_size=include_avg_household_size,
                     custom_guidance=custom_guidance,
                     hh_type_classifier=hh_type_classifier,
-                    hh_size_classifier=hh_size_classifier
+                    hh_size_classifier=hh_size_classifier,
+                    population_stats=population_stats
                 )
 
+        prompt = feedback_prompt(start, timings)
+        batches = [(i, min(batch_size, n_households - i)) for i in range(start, n_households, batch_size)]
+        next_batch = 0
+        in_flight = deque()
+
+        # Batch k is dispatched with the feedback of batches up to k - 1 - staleness, so up to
+        # `staleness` earlier batches can still be generating; results are folded in in batch order
+        with ThreadPoolExecutor(max_workers=staleness + 1) as executor:
+            while next_batch < len(batches) or in_flight:
+                while next_batch < len(batches) and len(in_flight) <= staleness:
+                    i, batch_count = batches[next_batch]
+                    batch_timings = timings.for_batch(i // batch_size + 1) if timings is not None else None
+                    print(f"\n--- Generating Batch {i // batch_size + 1} ({batch_count} households), Run {n_run} ---")
+                    future = executor.submit(
+                        self._generate_batch,
+                        model,
+                        prompt,
+                        size_plan[i:i+batch_count],
+                        sampled_rows.iloc[i:i+batch_count] if use_microdata else None,
+                        schema,
+                        households_per_request,
+                        max_parallel,
+                        batch_timings
+                    )
+                    in_flight.append((i, batch_count, batch_timings, future))
+                    next_batch += 1
+
+                i, batch_count, batch_timings, future = in_flight.popleft()
+                batch_results = future.result()
+                households.extend(batch_results)
+                with span(batch_timings, STATS_UPDATE):
+                    population_stats.add_households(batch_results)
+
+                if population_id is not None:
+                    with span(batch_timings, CHECKPOINT_WRITE):
+                        self.checkpoint_service.save_batch(population_id, batch_results, i + batch_count, rng.getstate())
+
+                if next_batch < len(batches):
+                    prompt = feedback_prompt(i + batch_count, batch_timings)
+
         return households
+
+    def resume(self, population_id: str, model: BaseLLM, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
+        """Continues a checkpointed run from its last completed batch and returns all of its households."""
+        checkpoint = self.checkpoint_service.load(population_id)
+        if checkpoint is None:
+            raise FileNotFoundError(f"No checkpoint found for population {population_id}")
+
+        config = dict(checkpoint["config"])
+        config.pop("size_plan")
+        config.pop("microdata_index")
+        config["hh_type_classifier"] = get_household_composition_classifier(config["hh_type_classifier"])
+        config["hh_size_classifier"] = get_household_size_classifier(config["hh_size_classifier"])
+
+        print(f"[INFO] Resuming population {population_id} from household {checkpoint['next_index'] + 1}")
+        return self.generate_households(model=model, **config, timings=timings, population_id=population_id, checkpoint=checkpoint)
     
-    def _plan_household_sizes(self, n_households: int, location: str) -> List[Optional[int]]:
+    def _plan_household_sizes(self, n_households: int, location: str, rng: random.Random) -> List[Optional[int]]:
         size_distribution = self.file_service.load_household_size(location)
         total = sum(size_distribution.values())
         size_distribution = {k: v / total for k, v in size_distribution.items()}
@@ -121,9 +216,9 @@ class PopulationService:
         for size, count in size_counts.items():
             size_plan.extend([size] * count)
 
-        random.shuffle(size_plan)
+        rng.shuffle(size_plan)
         while len(size_plan) < n_households:
-            size_plan.append(random.choice(list(size_distribution.keys())))
+            size_plan.append(rng.choice(list(size_distribution.keys())))
         while len(size_plan) > n_households:
             size_plan.pop()
 
@@ -144,9 +239,62 @@ class PopulationService:
             batch_prompts.append(prompt_filled)
         return batch_prompts
     
-    def _run_batch(self, model: BaseLLM, prompts: List[str], schema: str) -> List[Dict[str, Any]]:
+    def _prepare_multi_household_prompt(self, prompt_template: str, size_plan: List[Optional[int]], sampled_rows: Optional[pd.DataFrame]) -> str:
+        """Builds one prompt asking for a household per entry of the size plan (or per anchor row)."""
+        if sampled_rows is not None:
+            prompt = prompt_template.replace("{ANCHOR_PERSON}", "The anchor person of each household is listed at the end of these instructions.")
+            requirements = [f"Household {n + 1}: {convert_microdata_row(sampled_rows.iloc[n])}" for n in range(len(sampled_rows))]
+        else:
+            prompt = prompt_template.replace("{NUM_PEOPLE}", "the number of people listed for it at the end of these instructions")
+            requirements = [
+                f"Household {n + 1}: " + ("any size" if size is None else str(size) + (" person" if size == 1 else " people"))
+                for n, size in enumerate(size_plan)
+            ]
+
+        return prompt + self.file_service.load_prompt("multi_household.txt", {
+            "N_REQUESTED": len(size_plan),
+            "HOUSEHOLD_REQUIREMENTS": "\n".join(requirements),
+        })
+
+    def _generate_batch(self, model: BaseLLM, prompt: str, size_plan: List[Optional[int]], sampled_rows: Optional[pd.DataFrame], schema: Dict[str, Any], households_per_request: int, max_parallel: int = 4, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
+        """Generates the households of one batch from its feedback prompt."""
+        with span(timings, BATCH):
+            if households_per_request > 1:
+                return self._run_grouped_batch(model, prompt, size_plan, sampled_rows, schema, households_per_request, max_parallel, timings)
+
+            with span(timings, PROMPT_BUILD):
+                batch_prompts = self._prepare_batch_prompts(prompt, size_plan, sampled_rows)
+            print(f"Prompt (first in batch): {batch_prompts[0]}")
+            return self._run_batch(model, batch_prompts, schema, max_parallel, timings)
+
+    def _run_grouped_batch(self, model: BaseLLM, prompt_template: str, size_plan: List[Optional[int]], sampled_rows: Optional[pd.DataFrame], schema: Dict[str, Any], households_per_request: int, max_parallel: int = 4, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
+        def build_prompt(indices: List[int]) -> str:
+            with span(timings, PROMPT_BUILD):
+                return self._prepare_multi_household_prompt(
+                    prompt_template,
+                    [size_plan[j] for j in indices],
+                    sampled_rows.iloc[indices] if sampled_rows is not None else None
+                )
+
+        print(f"Prompt (first in batch): {build_prompt(list(range(min(households_per_request, len(size_plan)))))}")
+        try:
+            results = model.generate_grouped_json(
+                build_prompt,
+                len(size_plan),
+                schema,
+                households_per_request,
+                max_parallel=max_parallel,
+                timeout=60 * households_per_request,
+                timings=timings
+            )
+            return [result["household"] for result in results]
+        except Exception as e:
+            print(f"[ERROR] Batch generation failed: {e}")
+            return []
+
+    def _run_batch(self, model: BaseLLM, prompts: List[str], schema: str, max_parallel: int = 4, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
         try:
-            return model.generate_batch_json(prompts, schema, max_parallel=1, timeout=60)
+            return model.generate_batch_json(prompts, schema, max_parallel=max_parallel, timeout=60, timings=timings)
         except Exception as e:
             print(f"[ERROR] Batch generation failed: {e}")
             return []
@@ -154,5 +302,8 @@ class PopulationService:
     def get_by_id(self, id: str) -> Dict[str, Any]:
         return self.population_repository.get_population_by_id(id)
     
-    def save_population(self, population_id: str, households: List[Dict[str, Any]]):
-        return self.population_repository.insert_population(population_id, households)
+    def save_population(self, population_id: str, households: List[Dict[str, Any]], timings: Optional[Timings] = None):
+        with span(timings, DB_WRITE):
+            result = self.population_repository.insert_population(population_id, households)
+        self.checkpoint_service.delete(population_id)
+        return result
@@ -0,0 +1,32 @@
+from typing import Any, Dict, List
+from src.llm_interface.pricing import estimate_cost
+from src.repositories.timings_repository import TimingsRepository
+from src.utils.timing import Timings
+
+class TimingsService:
+    timings_repository: TimingsRepository
+
+    def __init__(self):
+        self.timings_repository = TimingsRepository()
+
+    def get_by_population_id(self, population_id: str) -> List[Dict[str, Any]]:
+        return self.timings_repository.get_timings_by_population_id(population_id)
+
+    def save_timings(self, population_id: str, timings: Timings):
+        """Stores the timings of a generation run. The population's metadata must be saved first."""
+        return self.timings_repository.insert_timings(population_id, timings.rows())
+
+    def get_usage_by_population_id(self, population_id: str) -> List[Dict[str, Any]]:
+        """Requests, tokens, request time and estimated cost (USD, None if the model is unpriced) per batch."""
+        return self._with_cost(self.timings_repository.get_usage_by_population_id(population_id))
+
+    def get_usage_by_experiment_id(self, experiment_id: str) -> List[Dict[str, Any]]:
+        """Requests, tokens, request time and estimated cost (USD, None if the model is unpriced) per run."""
+        return self._with_cost(self.timings_repository.get_usage_by_experiment_id(experiment_id))
+
+    @staticmethod
+    def _with_cost(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {**row, "cost": estimate_cost(row["model"], row["prompt_tokens"] or 0, row["completion_tokens"] or 0, row["cached_tokens"] or 0)}
+            for row in rows or []
+        ]
@@ -1,3 +1,5 @@
+from bisect import bisect_right
+from typing import Optional
 import pandas as pd
 
 
@@ -22,3 +24,11 @@ def assign_age_band(age_series: pd.Series) -> pd.Series:
     """Assigns age bands to a series of ages using predefined bins."""
     bins, labels = get_age_band_labels()
     return pd.cut(age_series, bins=bins, labels=labels, right=False)
+
+
+def get_age_band(age: float) -> Optional[str]:
+    """Assigns a single age to its band, matching assign_age_band. Returns None for missing or out-of-range ages."""
+    bins, labels = get_age_band_labels()
+    if age is None or age != age or age < bins[0] or age == float("inf"):
+        return None
+    return labels[bisect_right(bins, age) - 1]
@@ -0,0 +1,120 @@
+import json
+import re
+from typing import Any, Callable, List, Optional
+from jsonschema.protocols import Validator
+from src.utils.timing import JSON_PARSE, SCHEMA_VALIDATION, Timings, span
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", flags=re.DOTALL | re.IGNORECASE)
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", flags=re.DOTALL | re.IGNORECASE)
+_STRING_LITERAL = re.compile(r'"(?:[^"\\]|\\.)*"?', flags=re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# Only numbers that are object values: in an array, 45,100 is two elements
+_GROUPED_NUMBER = re.compile(r"(:\s*-?)(\d{1,3}(?:,\d{3})+)(?!\d)")
+
+
+def strip_reasoning(text: str) -> str:
+    """Removes <think>...</think> blocks, and anything before a closing tag whose opening tag is missing."""
+    text = _THINK_BLOCK.sub("", text)
+    if "</think>" in text:
+        text = text.rsplit("</think>", 1)[1]
+    return text.strip()
+
+
+def strip_code_fences(text: str) -> str:
+    """Returns the contents of the first ``` or ```json block, if there is one."""
+    match = _CODE_FENCE.search(text)
+    return match.group(1).strip() if match else text
+
+
+def extract_json_span(text: str) -> str:
+    """Drops any prose around the outermost JSON object or array."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _outside_strings(repair: Callable[[str], str], text: str) -> str:
+    """Applies repair to each stretch of text between string literals, leaving the literals untouched."""
+    parts = []
+    position = 0
+    for literal in _STRING_LITERAL.finditer(text):
+        parts.append(repair(text[position:literal.start()]))
+        parts.append(literal.group())
+        position = literal.end()
+    parts.append(repair(text[position:]))
+    return "".join(parts)
+
+
+def remove_trailing_commas(text: str) -> str:
+    return _outside_strings(lambda segment: _TRAILING_COMMA.sub(r"\1", segment), text)
+
+
+def remove_thousands_separators(text: str) -> str:
+    """Turns values such as "age": 12,345 into 12345. Only applied once the text is otherwise unparseable."""
+    def ungroup(segment: str) -> str:
+        return _GROUPED_NUMBER.sub(lambda m: m.group(1) + m.group(2).replace(",", ""), segment)
+
+    return _outside_strings(ungroup, text)
+
+
+# Applied cumulatively, least invasive first, until the text parses
+REPAIRS: List[Callable[[str], str]] = [
+    strip_reasoning,
+    strip_code_fences,
+    extract_json_span,
+    remove_trailing_commas,
+    remove_thousands_separators,
+]
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parses model output as JSON. If it does not parse as-is, the mechanical repairs in REPAIRS
+    are applied one after another until it does; if none succeeds, the original error is raised.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+
+    repaired = text
+    for repair in REPAIRS:
+        candidate = repair(repaired)
+        if candidate == repaired:
+            continue
+        repaired = candidate
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError:
+            continue
+    raise error
+
+
+def wrap_bare_array(data: Any, validator: Validator) -> Any:
+    """
+    If the schema expects an object but the model returned a bare array (e.g. the list of
+    household members without its wrapper), returns the first wrapping {property: array}
+    that validates. Otherwise returns the data unchanged.
+    """
+    schema = validator.schema
+    if not isinstance(data, list) or schema.get("type") != "object":
+        return data
+
+    for name, property_schema in schema.get("properties", {}).items():
+        if property_schema.get("type") == "array":
+            wrapped = {name: data}
+            if validator.is_valid(wrapped):
+                return wrapped
+    return data
+
+
+def parse_and_validate(text: str, validator: Validator, timings: Optional[Timings] = None) -> Any:
+    """Parses and repairs model output, then validates it. Raises json.JSONDecodeError or jsonschema.ValidationError."""
+    with span(timings, JSON_PARSE):
+        data = wrap_bare_array(parse_json(text), validator)
+    with span(timings, SCHEMA_VALIDATION):
+        validator.validate(data)
+    return data
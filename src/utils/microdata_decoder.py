@@ -1,6 +1,17 @@
 from typing import Any, Dict
 import pandas as pd
 
+# Microdata columns read by convert_microdata_row and the microdata sampler
+MICRODATA_COLUMNS = [
+    "sex",
+    "resident_age_6a",
+    "hh_size_9a",
+    "hh_families_type_6a",
+    "hh_adults_and_children_8m",
+    "economic_activity_status_4a",
+    "occupation_10a",
+    "industry_9a",
+]
 
 def decode_age(code: int) -> str:
     mapping = {
@@ -1,14 +1,66 @@
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
 
-def sample_microdata(microdata_df: pd.DataFrame, n: int) -> pd.DataFrame:
-    microdata_df["sampling_weight"] = np.where(
-        microdata_df["hh_size_9a"] == 0,
-        0,
-        1 / microdata_df["hh_size_9a"]
-    )
-    return microdata_df.sample(
-        n=n,
-        weights=microdata_df["sampling_weight"],
-        replace=False
-    )
\ No newline at end of file
+RandomState = Optional[Union[int, np.random.Generator]]
+
+
+class MicrodataSampler:
+    """
+    Weighted sampler of microdata anchor records, built once per region.
+    Each record is weighted by 1 / household size, so households rather than people are
+    sampled uniformly. Records with a household size of 0 are never drawn.
+
+    Draws return index labels of the microdata frame, so callers select rows with
+    `microdata_df.loc[...]` and the frame itself is never copied or modified.
+    """
+
+    def __init__(self, microdata_df: pd.DataFrame):
+        sizes = microdata_df["hh_size_9a"].to_numpy(dtype=np.float64)
+        weights = np.divide(1.0, sizes, out=np.zeros_like(sizes), where=sizes != 0)
+        # Missing sizes are never drawn, as with DataFrame.sample
+        weights = np.nan_to_num(weights, nan=0.0)
+        if (weights < 0).any():
+            raise ValueError("Sampling weights may not include negative values (check hh_size_9a)")
+
+        self.labels = microdata_df.index.to_numpy()
+        self.weights = weights
+        self.n_eligible = int(np.count_nonzero(weights))
+        # Built up front, so a sampler shared between threads is never seen half-initialised
+        self._cumulative_weights = np.cumsum(weights)
+        self._last_eligible = np.flatnonzero(weights)[-1] if self.n_eligible else -1
+
+    def sample_indices(self, n: int, replace: bool = False, random_state: RandomState = None) -> np.ndarray:
+        """
+        Draws n index labels.
+        Without replacement, uses exponential keys (Efraimidis-Spirakis): the n records with the
+        smallest Exp(1) / weight keys, in key order, are distributed as n sequential weighted draws.
+        With replacement, draws from the cumulative weights, so n can exceed the number of records.
+        """
+        rng = np.random.default_rng(random_state)
+        if replace:
+            return self.labels[self._draw_with_replacement(n, rng)]
+
+        if n > self.n_eligible:
+            raise ValueError(f"Cannot sample {n} households without replacement from {self.n_eligible} eligible records")
+        if n == 0:
+            return self.labels[:0]
+
+        with np.errstate(divide="ignore"):
+            keys = rng.standard_exponential(len(self.weights)) / self.weights
+        chosen = np.argpartition(keys, n - 1)[:n]
+        return self.labels[chosen[np.argsort(keys[chosen], kind="stable")]]
+
+    def _draw_with_replacement(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        if self.n_eligible == 0:
+            raise ValueError("No eligible records to sample from")
+        targets = rng.random(n) * self._cumulative_weights[-1]
+        positions = np.searchsorted(self._cumulative_weights, targets, side="right")
+        # Guards against a target rounding up to the total
+        return np.minimum(positions, self._last_eligible)
+
+
+def sample_microdata(microdata_df: pd.DataFrame, n: int, random_state: RandomState = None, sampler: Optional[MicrodataSampler] = None) -> pd.DataFrame:
+    """Samples n anchor records without replacement. Pass a cached sampler to avoid rebuilding the weights."""
+    sampler = sampler or MicrodataSampler(microdata_df)
+    return microdata_df.loc[sampler.sample_indices(n, random_state=random_state)]
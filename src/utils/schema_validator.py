@@ -1,12 +1,57 @@
+from typing import Any, Dict, Tuple
 import jsonschema
+from jsonschema.protocols import Validator
 from src.services.file_service import FileService
 
+# Compiled validators keyed by schema object identity. The schema is kept alongside
+# its validator so the id cannot be reused while the entry exists.
+_VALIDATORS: Dict[int, Tuple[Dict[str, Any], Validator]] = {}
+_ARRAY_SCHEMAS: Dict[Tuple[int, str], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+
+def get_validator(schema: Dict[str, Any]) -> Validator:
+    """Returns a compiled validator for the schema, checking and building it only once."""
+    entry = _VALIDATORS.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    validator = validator_cls(schema)
+    _VALIDATORS[id(schema)] = (schema, validator)
+    return validator
+
+
+def get_array_schema(item_schema: Dict[str, Any], key: str = "households") -> Dict[str, Any]:
+    """
+    Returns the schema of an object holding an array of `item_schema` items under `key`,
+    e.g. {"households": [household, ...]}. The same object is returned for the same item schema,
+    so its compiled validator is reused as well.
+    """
+    entry = _ARRAY_SCHEMAS.get((id(item_schema), key))
+    if entry is not None and entry[0] is item_schema:
+        return entry[1]
+
+    items = {k: v for k, v in item_schema.items() if k != "$schema"}
+    schema = {
+        "$schema": item_schema.get("$schema", "http://json-schema.org/draft-07/schema#"),
+        "type": "object",
+        "properties": {
+            key: {"type": "array", "minItems": 1, "items": items}
+        },
+        "required": [key],
+        "additionalProperties": False
+    }
+    _ARRAY_SCHEMAS[(id(item_schema), key)] = (item_schema, schema)
+    return schema
+
+
 def validate_household(household_data: dict) -> bool:
     """Validates household data against the predefined schema."""
     file_service = FileService()
     schema = file_service.load_schema("household_schema.json")
     try:
-        jsonschema.validate(instance=household_data, schema=schema)
+        get_validator(schema).validate(household_data)
         return True 
     except jsonschema.exceptions.ValidationError as e:
         print(f"❌ Schema Validation Error: {e}")
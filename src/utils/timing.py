@@ -0,0 +1,112 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+# Stages recorded during a generation run
+PROMPT_BUILD = "prompt_build"
+LLM_REQUEST = "llm_request"
+CACHE_HIT = "cache_hit"
+JSON_PARSE = "json_parse"
+SCHEMA_VALIDATION = "schema_validation"
+RETRY = "retry"
+STATS_UPDATE = "stats_update"
+CHECKPOINT_WRITE = "checkpoint_write"
+DB_WRITE = "db_write"
+BATCH = "batch"
+
+
+# Token counters kept alongside each stage's timings, in the order they are stored
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "cached_tokens")
+
+
+class Timings:
+    """
+    Thread-safe timing spans of a generation run, aggregated per batch and stage
+    into a count, a total and a maximum duration. Events without a duration (such as
+    retries) are recorded with `count`, and the tokens LLM requests report are added
+    with `add_tokens`. Spans are recorded under batch None unless they are made on a
+    view returned by `for_batch`.
+    """
+
+    def __init__(self):
+        self.batch: Optional[int] = None
+        self._stages: Dict[Tuple[Optional[int], str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def for_batch(self, batch: int) -> "Timings":
+        """
+        A view of these timings whose spans are attributed to `batch` (numbered from 1).
+        Views share their counts with the run, so batches in flight at the same time are kept apart.
+        """
+        view = Timings.__new__(Timings)
+        view.batch = batch
+        view._stages = self._stages
+        view._lock = self._lock
+        return view
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, self.batch)
+
+    def record(self, stage: str, seconds: float, batch: Optional[int] = None):
+        with self._lock:
+            entry = self._entry(batch, stage)
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def count(self, stage: str):
+        self.record(stage, 0.0, self.batch)
+
+    def add_tokens(self, stage: str, prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0):
+        """Adds token usage to a stage without counting another event."""
+        with self._lock:
+            entry = self._entry(self.batch, stage)
+            entry[3] += prompt_tokens
+            entry[4] += completion_tokens
+            entry[5] += cached_tokens
+
+    def _entry(self, batch: Optional[int], stage: str) -> List[float]:
+        return self._stages.setdefault((batch, stage), [0, 0.0, 0.0, 0, 0, 0])
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One row per batch and stage, as stored in the timings table."""
+        with self._lock:
+            return [
+                {"batch": batch, "stage": stage, "count": count, "total_seconds": total, "max_seconds": maximum, **dict(zip(TOKEN_FIELDS, tokens))}
+                for (batch, stage), (count, total, maximum, *tokens) in self._stages.items()
+            ]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Totals per stage across the whole run."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for row in self.rows():
+            stage = summary.setdefault(row["stage"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, **dict.fromkeys(TOKEN_FIELDS, 0)})
+            stage["count"] += row["count"]
+            stage["total_seconds"] += row["total_seconds"]
+            stage["max_seconds"] = max(stage["max_seconds"], row["max_seconds"])
+            for field in TOKEN_FIELDS:
+                stage[field] += row[field]
+        return summary
+
+
+def span(timings: Optional[Timings], stage: str):
+    """A timing span on `timings`, or a no-op when timings are not being recorded."""
+    return timings.span(stage) if timings is not None else nullcontext()
+
+
+def count(timings: Optional[Timings], stage: str):
+    """Counts an event on `timings`, if timings are being recorded."""
+    if timings is not None:
+        timings.count(stage)
+
+
+def add_tokens(timings: Optional[Timings], stage: str, prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0):
+    """Adds token usage to a stage of `timings`, if timings are being recorded."""
+    if timings is not None:
+        timings.add_tokens(stage, prompt_tokens, completion_tokens, cached_tokens)